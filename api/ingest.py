@@ -14,7 +14,7 @@ from src.brd_agent.services.github_client import GitHubClient
 from src.brd_agent.services.document_loaders import load_markdown
 from src.brd_agent.services.chunking import chunk_markdown
 from src.brd_agent.services.embeddings import EmbeddingService
-from src.brd_agent.services.vector_store import VectorStore
+from src.brd_agent.services.vector_store import VectorStore, get_shared_vector_store
 from src.brd_agent.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -186,7 +186,7 @@ async def ingest_document(request: IngestDocumentRequest):
         # Initialize services
         github_client = GitHubClient()
         embedding_service = EmbeddingService()
-        vector_store = VectorStore()
+        vector_store = get_shared_vector_store()
         
         # Process file
         result = process_file(
@@ -241,7 +241,7 @@ async def ingest_repo_path(request: IngestRepoPathRequest):
         # Initialize services
         github_client = GitHubClient()
         embedding_service = EmbeddingService()
-        vector_store = VectorStore()
+        vector_store = get_shared_vector_store()
         
         # Fetch repository tree
         repo_tree = github_client.get_repo_tree(request.repo_url, request.path)
@@ -315,7 +315,7 @@ async def get_ingestion_status(
     logger.info(f"Checking ingestion status for: {repo_url}")
     
     try:
-        vector_store = VectorStore()
+        vector_store = get_shared_vector_store()
         collection = vector_store.get_collection(repo_url)
         
         if collection is None:
@@ -364,7 +364,7 @@ async def list_repos():
     logger.info("Listing all ingested repositories")
     
     try:
-        vector_store = VectorStore()
+        vector_store = get_shared_vector_store()
         client = vector_store.client
         
         # Get all collections
@@ -425,7 +425,7 @@ async def delete_document(
     logger.info(f"Deleting document: {file_path} from {repo_url}")
     
     try:
-        vector_store = VectorStore()
+        vector_store = get_shared_vector_store()
         collection = vector_store.get_collection(repo_url)
         
         if collection is None:
@@ -493,7 +493,7 @@ async def delete_repo(
     logger.info(f"Deleting repository collection: {repo_url}")
     
     try:
-        vector_store = VectorStore()
+        vector_store = get_shared_vector_store()
         collection = vector_store.get_collection(repo_url)
         
         if collection is None:
@@ -504,8 +504,8 @@ async def delete_repo(
         
         collection_name = collection.name
         
-        # Delete the collection
-        vector_store.client.delete_collection(collection_name)
+        # Delete the collection (through the store, so its cached handle is dropped too)
+        vector_store.delete_collection(repo_url)
         
         return {
             "success": True,
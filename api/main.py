@@ -14,7 +14,7 @@ from typing import Optional
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from pypdf import PdfReader
 
 # Import ingestion router
@@ -62,8 +62,7 @@ class BRDRequest(BaseModel):
     # Alternative: wrapped data
     brd_data: Optional[dict] = None
     
-    class Config:
-        extra = "allow"  # Allow additional fields
+    model_config = ConfigDict(extra="allow")  # Allow additional fields
 
 
 class ProcessingResponse(BaseModel):
@@ -259,9 +258,9 @@ async def process_brd(request: BRDRequest):
         # Get the workflow
         workflow = get_workflow()
         
-        # Run the pipeline
+        # Run the pipeline (awaited, so the event loop keeps serving other requests)
         logger.info("Starting BRD pipeline...")
-        result = workflow.run(normalized_input)
+        result = await workflow.arun(normalized_input)
         
         # Extract results
         engineering_plan = result.get("engineering_plan", {})
@@ -277,9 +277,13 @@ def main():
     console.print("[bold cyan]Step 4: Prompt Comparison[/bold cyan]")
     console.print("[bold cyan]" + "─" * 70)
     
-    full_brd = parsed_brd.model_dump()
-    prompt_without = planner._build_prompt(full_brd, retrieved_context=None)
-    prompt_with = planner._build_prompt(full_brd, retrieved_context=retrieved_context)
+    brd_json = parsed_brd.model_dump_json()
+    _, user_blocks_without = planner._build_prompt(brd_json, retrieved_context=None)
+    _, user_blocks_with = planner._build_prompt(brd_json, retrieved_context=retrieved_context)
+    
+    # The static instructions are a separate cached system prompt; compare the user messages
+    prompt_without = "".join(block["text"] for block in user_blocks_without)
+    prompt_with = "".join(block["text"] for block in user_blocks_with)
     
     console.print("\n[bold]Prompt WITHOUT Context:[/bold]")
     console.print(f"[dim]Length: {len(prompt_without)} characters[/dim]")
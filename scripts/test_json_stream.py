@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test script for StreamingArrayParser
+
+Tests incremental extraction of array items from streamed JSON text:
+1. Same items whether fed 1 char, n chars or the whole text at a time
+2. Escaped quotes and brackets inside strings
+3. Nested objects and arrays inside items
+4. Target key also used in unrelated (non-array) values
+5. Only the unfinished item is buffered between feeds
+"""
+
+import sys
+import json
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.brd_agent.services.json_stream import StreamingArrayParser
+
+
+FEATURES = [
+    {
+        "feature_id": "F1",
+        "feature_name": "Say \"hello\" to users",
+        "description": "Brackets ] } [ { and a colon: inside a string",
+        "details": {"acceptance": [{"id": 1, "text": "works"}, {"id": 2, "text": "}]"}]}
+    },
+    {
+        "feature_id": "F2",
+        "feature_name": "Windows paths like C:\\dir\\",
+        "dependencies": ["F1"],
+        # Same key nested inside an item is part of the item, not a new array
+        "feature_breakdown": [{"feature_id": "F2a"}]
+    },
+    {
+        "feature_id": "F3",
+        "feature_name": "Unicode caf\u00e9 \u2713",
+        "dependencies": []
+    }
+]
+
+DOCUMENT = {
+    "engineering_plan": {
+        "project_overview": {
+            "name": "Test Project",
+            # Target key with non-array values in an unrelated object
+            "summary": {"feature_breakdown": {"feature_id": "NOT-AN-ITEM"}, "note": "feature_breakdown"}
+        },
+        "feature_breakdown": FEATURES,
+        "implementation_phases": [{"phase_number": 1, "phase_name": "MVP"}]
+    }
+}
+
+
+def feed_in_chunks(text: str, size: int) -> tuple:
+    """Feed text to a new parser in chunks of size; return (items, largest buffer)."""
+    parser = StreamingArrayParser("feature_breakdown")
+    items = []
+    largest_buffer = 0
+    for i in range(0, len(text), size):
+        items.extend(parser.feed(text[i:i + size]))
+        largest_buffer = max(largest_buffer, len(parser._text))
+    return items, largest_buffer
+
+
+def test_chunk_sizes():
+    """Test that every chunking of the document yields the same items."""
+    print("=" * 70)
+    print("StreamingArrayParser - Chunk Size Test")
+    print("=" * 70)
+    
+    for text in (json.dumps(DOCUMENT), json.dumps(DOCUMENT, indent=2)):
+        for size in (1, 2, 7, 64, len(text)):
+            items, _ = feed_in_chunks(text, size)
+            assert items == FEATURES, f"Chunk size {size} yielded {items}"
+        print(f"✓ {len(text)}-char document: same items for 1, 2, 7, 64 and whole-text chunks")
+    
+    return True
+
+
+def test_string_contents():
+    """Test that escaped quotes and brackets inside strings don't end items early."""
+    print("\n" + "=" * 70)
+    print("StreamingArrayParser - String Contents Test")
+    print("=" * 70)
+    
+    items, _ = feed_in_chunks(json.dumps(DOCUMENT), 1)
+    assert items[0]["feature_name"] == 'Say "hello" to users', f"Escaped quotes lost: {items[0]}"
+    print("✓ Escaped quotes kept in string values")
+    
+    assert items[0]["description"] == FEATURES[0]["description"], f"Brackets in string lost: {items[0]}"
+    print("✓ Brackets inside strings don't close the item")
+    
+    assert items[1]["feature_name"] == "Windows paths like C:\\dir\\", f"Escaped backslash lost: {items[1]}"
+    print("✓ Escaped backslash before a closing quote")
+    
+    return True
+
+
+def test_nesting_and_unrelated_keys():
+    """Test nested objects in items and the target key outside the target array."""
+    print("\n" + "=" * 70)
+    print("StreamingArrayParser - Nesting Test")
+    print("=" * 70)
+    
+    items, _ = feed_in_chunks(json.dumps(DOCUMENT), 3)
+    assert [item["feature_id"] for item in items] == ["F1", "F2", "F3"], f"Unexpected items: {items}"
+    print("✓ Only top-level items of the target array are returned")
+    
+    assert items[0]["details"]["acceptance"][1]["text"] == "}]", f"Nested object lost: {items[0]}"
+    print("✓ Nested objects and arrays stay inside their item")
+    
+    assert items[1]["feature_breakdown"] == [{"feature_id": "F2a"}], f"Nested key lost: {items[1]}"
+    print("✓ Target key nested inside an item doesn't start a new array")
+    
+    items, _ = feed_in_chunks('{"feature_breakdown": {"feature_id": "X"}, "other": [{"a": 1}]}', 1)
+    assert items == [], f"Non-array value yielded items: {items}"
+    print("✓ Target key with a non-array value yields nothing")
+    
+    return True
+
+
+def test_buffer_size():
+    """Test that only the unfinished item is buffered, not the whole stream."""
+    print("\n" + "=" * 70)
+    print("StreamingArrayParser - Buffer Size Test")
+    print("=" * 70)
+    
+    text = json.dumps({"feature_breakdown": [{"feature_id": f"F{i}", "padding": "x" * 50} for i in range(200)]})
+    longest_item = len(json.dumps({"feature_id": "F199", "padding": "x" * 50}))
+    
+    items, largest_buffer = feed_in_chunks(text, 5)
+    assert len(items) == 200, f"Expected 200 items, got {len(items)}"
+    assert largest_buffer <= longest_item + 5, (
+        f"Buffered {largest_buffer} chars for items of at most {longest_item}"
+    )
+    print(f"✓ Largest buffer {largest_buffer} chars for a {len(text)}-char stream")
+    
+    return True
+
+
+def main():
+    """Run all tests."""
+    try:
+        results = [
+            # Test 1: Chunk sizes
+            test_chunk_sizes(),
+            
+            # Test 2: String contents
+            test_string_contents(),
+            
+            # Test 3: Nesting and unrelated keys
+            test_nesting_and_unrelated_keys(),
+            
+            # Test 4: Buffer size
+            test_buffer_size(),
+        ]
+        
+        if not all(results):
+            print(f"\n❌ {results.count(False)} of {len(results)} StreamingArrayParser tests failed")
+            return False
+        
+        print("\n" + "=" * 70)
+        print("✅ All StreamingArrayParser tests passed!")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  ✓ Same items for any chunking of the stream")
+        print("  ✓ Escapes and brackets inside strings handled")
+        print("  ✓ Nested values stay inside their item")
+        print("  ✓ Target key outside the array ignored")
+        print("  ✓ Buffer limited to the unfinished item")
+        
+        return True
+    
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Test script for PlannerAgent JSON repair
+
+Tests recovery of malformed plan responses by _repair_json():
+1. Truncated output (mid-array, mid-object, mid-string)
+2. Trailing commas before ] and }
+3. Escaped quotes and backslashes inside strings
+4. Closing brackets inside strings
+5. Unrecoverable input returns None
+6. Repaired plans are not written to the PlanCache
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.brd_agent.agents.planner import PlannerAgent, _repair_json
+from src.brd_agent.models.brd import ParsedBRD
+from src.brd_agent.services.llm import LLMService
+from src.brd_agent.services.plan_cache import PlanCache
+
+
+PLAN_RESPONSE = {
+    "engineering_plan": {
+        "project_overview": {"name": "Test Project", "objectives": ["Ship login"]},
+        "feature_breakdown": [
+            {"feature_id": "F1", "feature_name": "Login", "dependencies": []},
+            {"feature_id": "F2", "feature_name": "Search", "dependencies": ["F1"]}
+        ]
+    }
+}
+
+
+class StaticLLM(LLMService):
+    """Fake LLM service that always returns the same response text."""
+    
+    model = "fake-model"
+    
+    def __init__(self, response_text: str):
+        self.response_text = response_text
+    
+    def generate(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        return self.response_text
+    
+    def generate_json(self, prompt, system_prompt=None):
+        return json.loads(self.response_text)
+
+
+def load_sample_brd() -> ParsedBRD:
+    """Load sample BRD for testing."""
+    brd_path = project_root / "sample_inputs" / "brds" / "demo_step10_query_expansion.json"
+    
+    with open(brd_path, 'r') as f:
+        data = json.load(f)
+    
+    return ParsedBRD(**data)
+
+
+def check_repairs(cases: list) -> None:
+    """Assert that each (text, expected) pair repairs to the expected value."""
+    for text, expected in cases:
+        repaired = _repair_json(text)
+        assert repaired == expected, f"_repair_json({text!r}) returned {repaired!r}, expected {expected!r}"
+        print(f"✓ {text!r}")
+
+
+def test_truncated_output():
+    """Test that output cut off at max_tokens is closed at the last complete element."""
+    print("=" * 70)
+    print("JSON Repair - Truncated Output Test")
+    print("=" * 70)
+    
+    check_repairs([
+        # Mid-array
+        ('{"a": [1, 2, 3', {"a": [1, 2, 3]}),
+        ('{"a": [{"id": 1}, {"id": 2}, {"id"', {"a": [{"id": 1}, {"id": 2}]}),
+        # Mid-object
+        ('{"a": 1, "b": {"c": 2, "d"', {"a": 1, "b": {"c": 2}}),
+        ('{"a": 1, "b": {"c": 2, "d":', {"a": 1, "b": {"c": 2}}),
+        # Mid-string
+        ('{"a": "trunc', {"a": "trunc"}),
+        ('{"a": ["x", "y', {"a": ["x", "y"]}),
+    ])
+    
+    return True
+
+
+def test_trailing_commas():
+    """Test that trailing commas before ] and } are dropped."""
+    print("\n" + "=" * 70)
+    print("JSON Repair - Trailing Comma Test")
+    print("=" * 70)
+    
+    check_repairs([
+        ('{"a": [1, 2, ]}', {"a": [1, 2]}),
+        ('{"a": 1, }', {"a": 1}),
+        ('{"a": [1, 2, ], "b": {"c": 1 ,\n }, }', {"a": [1, 2], "b": {"c": 1}}),
+        # Commas inside strings are left alone
+        ('{"a": "x,}", }', {"a": "x,}"}),
+    ])
+    
+    return True
+
+
+def test_escapes_and_brackets_in_strings():
+    """Test that escaped quotes, backslashes and brackets inside strings are kept as text."""
+    print("\n" + "=" * 70)
+    print("JSON Repair - String Contents Test")
+    print("=" * 70)
+    
+    check_repairs([
+        # Escaped quote
+        ('{"a": "say \\"hi\\"", }', {"a": 'say "hi"'}),
+        ('prose {"a": "q\\",]", "b": [1,2,', {"a": 'q",]', "b": [1, 2]}),
+        # Escaped backslash right before the closing quote
+        ('{"path": "C:\\\\dir\\\\", "b": [1,', {"path": "C:\\dir\\", "b": [1]}),
+        # Closing brackets inside strings
+        ('{"a": "}", "b": 1, }', {"a": "}", "b": 1}),
+        ('{"a": "]", "b": ["x", ],}', {"a": "]", "b": ["x"]}),
+    ])
+    
+    return True
+
+
+def test_surrounding_text_and_garbage():
+    """Test that prose around the object is ignored and garbage returns None."""
+    print("\n" + "=" * 70)
+    print("JSON Repair - Surrounding Text Test")
+    print("=" * 70)
+    
+    check_repairs([
+        ('Here is the plan: {"a": 1}, trailing', {"a": 1}),
+        ("garbage", None),
+        ("", None),
+        ('{"a": tru', None),
+        ('{"a": 1} }', {"a": 1}),
+    ])
+    
+    return True
+
+
+def test_repaired_plan_not_cached():
+    """Test that a repaired plan is returned but never written to the PlanCache."""
+    print("\n" + "=" * 70)
+    print("JSON Repair - Plan Cache Test")
+    print("=" * 70)
+    
+    brd = load_sample_brd()
+    clean_text = json.dumps(PLAN_RESPONSE)
+    # Cut off inside the second feature's dependencies, as if max_tokens was reached
+    truncated_text = clean_text[:clean_text.index('["F1"]') + 2]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = PlanCache(db_path=str(Path(tmp_dir) / "plans.db"))
+        
+        plan = PlannerAgent(llm_service=StaticLLM(truncated_text), plan_cache=cache).run(brd)
+        features = plan.engineering_plan.feature_breakdown
+        assert [f.feature_name for f in features] == ["Login", "Search"], f"Unexpected repaired features: {features}"
+        print("✓ Truncated response repaired")
+        
+        assert len(cache) == 0, f"Repaired plan was cached ({len(cache)} entries)"
+        print("✓ Repaired plan not written to the cache")
+        
+        PlannerAgent(llm_service=StaticLLM(clean_text), plan_cache=cache).run(brd)
+        assert len(cache) == 1, f"Clean plan should be cached ({len(cache)} entries)"
+        print("✓ Clean plan written to the cache")
+    
+    return True
+
+
+def main():
+    """Run all tests."""
+    try:
+        results = [
+            # Test 1: Truncated output
+            test_truncated_output(),
+            
+            # Test 2: Trailing commas
+            test_trailing_commas(),
+            
+            # Test 3: Escapes and brackets inside strings
+            test_escapes_and_brackets_in_strings(),
+            
+            # Test 4: Surrounding text and garbage
+            test_surrounding_text_and_garbage(),
+            
+            # Test 5: Plan cache
+            test_repaired_plan_not_cached(),
+        ]
+        
+        if not all(results):
+            print(f"\n❌ {results.count(False)} of {len(results)} JSON repair tests failed")
+            return False
+        
+        print("\n" + "=" * 70)
+        print("✅ All JSON repair tests passed!")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  ✓ Truncated arrays, objects and strings are closed")
+        print("  ✓ Trailing commas are dropped")
+        print("  ✓ String contents are never rewritten")
+        print("  ✓ Unrecoverable input returns None")
+        print("  ✓ Repaired plans are not cached")
+        
+        return True
+    
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
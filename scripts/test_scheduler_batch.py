@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Test script for SchedulerAgent batch scheduling
+
+Tests SchedulerAgent.run_batch() with a fake LLM whose async client is
+bound to the event loop that first used it (like an httpx connection pool):
+1. Schedule a batch of plans in input order
+2. Call run_batch() twice in one process
+3. Verify the LLM's async client is closed when each batch finishes
+"""
+
+import re
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.brd_agent.agents.scheduler import SchedulerAgent
+from src.brd_agent.models.plan import EngineeringPlan
+from src.brd_agent.services.llm import LLMService
+from src.brd_agent.config import get_settings
+
+
+SCHEDULE_RESPONSE = {
+    "project_schedule": {
+        "project_info": {
+            "project_name": "Test Project",
+            "start_date": "2026-01-05",
+            "estimated_end_date": "2026-03-02"
+        },
+        "phases": [
+            {
+                "phase_id": "P1",
+                "phase_name": "MVP",
+                "start_date": "2026-01-05",
+                "end_date": "2026-03-02",
+                "tasks": [
+                    {"task_id": "T1", "task_name": "Build login", "status": "Not Started"}
+                ]
+            }
+        ]
+    }
+}
+
+
+class LoopBoundLLM(LLMService):
+    """
+    Fake LLM service whose async client belongs to one event loop.
+    
+    Using it from a new loop without aclose() fails the way a pooled
+    async HTTP client does once the loop that opened it has closed.
+    """
+    
+    model = "fake-model"
+    
+    def __init__(self):
+        self._client_loop = None
+        self.async_calls = 0
+        self.closed = 0
+    
+    def generate(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        return json.dumps(SCHEDULE_RESPONSE)
+    
+    def generate_json(self, prompt, system_prompt=None):
+        return SCHEDULE_RESPONSE
+    
+    async def generate_async(self, prompt, system_prompt=None, max_tokens=None, temperature=None):
+        loop = asyncio.get_running_loop()
+        if self._client_loop is None:
+            self._client_loop = loop
+        elif self._client_loop is not loop:
+            raise RuntimeError("Event loop is closed")
+        self.async_calls += 1
+        await asyncio.sleep(0)
+        
+        # Echo the plan's project name so callers can check result order
+        prompt_text = "".join(block["text"] for block in prompt)
+        response = json.loads(json.dumps(SCHEDULE_RESPONSE))
+        response["project_schedule"]["project_info"]["project_name"] = re.search(r"Project \d+", prompt_text).group(0)
+        return json.dumps(response)
+    
+    async def aclose(self):
+        if self._client_loop is None:
+            return
+        assert self._client_loop is asyncio.get_running_loop(), "aclose() called from another loop"
+        self._client_loop = None
+        self.closed += 1
+
+
+def create_plans(count: int) -> list:
+    """Create engineering plans with distinct project names."""
+    return [
+        EngineeringPlan(**{"engineering_plan": {"project_overview": {"name": f"Project {i}"}}})
+        for i in range(count)
+    ]
+
+
+def create_scheduler(llm: LLMService) -> SchedulerAgent:
+    """Create a SchedulerAgent without a schedule cache so every plan hits the LLM."""
+    settings = get_settings()
+    original_cache_enabled = settings.schedule_cache_enabled
+    settings.schedule_cache_enabled = False
+    try:
+        return SchedulerAgent(llm_service=llm)
+    finally:
+        settings.schedule_cache_enabled = original_cache_enabled
+
+
+def test_run_batch_order():
+    """Test that run_batch() returns one schedule per plan, in input order."""
+    print("=" * 70)
+    print("SchedulerAgent Batch - Order Test")
+    print("=" * 70)
+    
+    llm = LoopBoundLLM()
+    scheduler = create_scheduler(llm)
+    plans = create_plans(3)
+    
+    schedules = scheduler.run_batch(plans, start_date="2026-01-05")
+    
+    assert len(schedules) == 3, f"Expected 3 schedules, got {len(schedules)}"
+    names = [s.project_schedule.project_info.project_name for s in schedules]
+    assert names == ["Project 0", "Project 1", "Project 2"], f"Schedules out of order: {names}"
+    assert llm.async_calls == 3, f"Expected 3 async LLM calls, got {llm.async_calls}"
+    print("✓ One schedule per plan, in input order")
+    
+    assert scheduler.run_batch([]) == [], "Empty batch should return no schedules"
+    print("✓ Empty batch returns an empty list")
+    
+    return True
+
+
+def test_run_batch_twice():
+    """Test that run_batch() can be called again after its event loop has closed."""
+    print("\n" + "=" * 70)
+    print("SchedulerAgent Batch - Repeated Calls Test")
+    print("=" * 70)
+    
+    llm = LoopBoundLLM()
+    scheduler = create_scheduler(llm)
+    
+    first = scheduler.run_batch(create_plans(2), start_date="2026-01-05")
+    assert len(first) == 2, f"Expected 2 schedules from first batch, got {len(first)}"
+    assert llm.closed == 1, f"Async client should be closed after first batch (closed={llm.closed})"
+    print("✓ First batch scheduled and its async client closed")
+    
+    second = scheduler.run_batch(create_plans(2), start_date="2026-01-05")
+    assert len(second) == 2, f"Expected 2 schedules from second batch, got {len(second)}"
+    assert llm.closed == 2, f"Async client should be closed after second batch (closed={llm.closed})"
+    print("✓ Second batch scheduled on a new event loop")
+    
+    return True
+
+
+def main():
+    """Run all tests."""
+    try:
+        results = [
+            # Test 1: Batch order
+            test_run_batch_order(),
+            
+            # Test 2: Repeated run_batch() calls
+            test_run_batch_twice(),
+        ]
+        
+        if not all(results):
+            print(f"\n❌ {results.count(False)} of {len(results)} scheduler batch tests failed")
+            return False
+        
+        print("\n" + "=" * 70)
+        print("✅ All scheduler batch tests passed!")
+        print("=" * 70)
+        print("\nSummary:")
+        print("  ✓ run_batch() keeps input order")
+        print("  ✓ run_batch() can be called more than once per process")
+        print("  ✓ Each batch closes the LLM's async client for its loop")
+        
+        return True
+    
+    except AssertionError as e:
+        print(f"\n❌ Test failed: {e}")
+        return False
+    except Exception as e:
+        print(f"\n❌ Unexpected error: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -7,11 +7,13 @@ Tests the BRD workflow with RetrieverAgent integrated:
 2. Test workflow with RAG disabled
 3. Test workflow with missing collection (graceful degradation)
 4. Verify retrieved_context flows to Planner
+5. Verify run_json() serializes a final state with retrieved chunks
 """
 
 import sys
 import json
 from pathlib import Path
+from types import SimpleNamespace
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
@@ -203,6 +205,66 @@ def test_workflow_with_rag_enabled():
         settings.rag_enabled = original_rag_enabled
 
 
+def test_run_json_with_retrieved_context():
+    """Test that run_json() encodes a final state that includes retrieved chunks."""
+    print("\n" + "-" * 70)
+    print("Test 5: run_json() with Retrieved Context")
+    print("-" * 70)
+    
+    settings = get_settings()
+    original_rag_enabled = settings.rag_enabled
+    
+    try:
+        # Enable RAG
+        settings.rag_enabled = True
+        
+        workflow = BRDWorkflow()
+        input_data = create_sample_input()
+        
+        # Stub retrieval with chunks built by the real RetrieverAgent formatter,
+        # so the test does not depend on an ingested collection
+        chunks = workflow.retriever._format_results({
+            'documents': [[
+                "## Authentication\n\nThe REST API supports OAuth2 login...",
+                "## Configuration\n\nSettings are read from environment variables...",
+            ]],
+            'metadatas': [[
+                {'file_path': 'docs/api.md', 'line_start': 1, 'line_end': 12},
+                {'file_path': 'docs/configuration.md', 'line_start': 1, 'line_end': 20},
+            ]],
+            'distances': [[0.12, 0.34]],
+        })
+        workflow.retriever.vector_store = SimpleNamespace(
+            get_collection=lambda repo_url: SimpleNamespace(count=lambda: len(chunks)),
+            forget_collection=lambda repo_url: None,
+        )
+        workflow.retriever.run = lambda parsed_brd, repo_url=None: chunks
+        
+        print("Running workflow.run_json() with 2 retrieved chunks...")
+        result = json.loads(workflow.run_json(input_data))
+        
+        assert result.get('status') == 'success', f"Workflow failed: {result.get('message')}"
+        assert 'context_retrieval' in result.get('stages_completed', []), "Retriever stage not completed"
+        print("✓ Workflow completed successfully with retrieval")
+        
+        retrieved_context = result.get('retrieved_context')
+        assert isinstance(retrieved_context, list) and len(retrieved_context) == 2, \
+            "retrieved_context should hold the 2 retrieved chunks"
+        assert all(set(chunk) == {'content', 'source', 'metadata', 'distance'} for chunk in retrieved_context), \
+            "Retrieved chunks should only carry public fields"
+        print("✓ run_json() encoded retrieved_context (public chunk fields only)")
+        
+        assert 'brd_model' not in result and 'engineering_plan_model' not in result, \
+            "Internal model hand-off keys should be excluded"
+        print("✓ Internal model hand-off keys excluded")
+        
+        return True
+    
+    finally:
+        # Restore original setting
+        settings.rag_enabled = original_rag_enabled
+
+
 def main():
     """Run all tests."""
     try:
@@ -218,6 +280,9 @@ def main():
         # Test 4: RAG Enabled
         test_workflow_with_rag_enabled()
         
+        # Test 5: run_json() with retrieved context
+        test_run_json_with_retrieved_context()
+        
         print("\n" + "=" * 70)
         print("✅ All Step 11 tests passed!")
         print("=" * 70)
@@ -227,6 +292,7 @@ def main():
         print("  ✓ Graceful degradation works (RAG disabled)")
         print("  ✓ Graceful degradation works (missing collection)")
         print("  ✓ Workflow continues successfully in all scenarios")
+        print("  ✓ run_json() encodes retrieved context")
         
         return True
         
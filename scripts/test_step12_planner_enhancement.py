@@ -37,6 +37,12 @@ def load_sample_brd() -> ParsedBRD:
     return ParsedBRD(**data)
 
 
+def user_prompt_text(prompt: tuple) -> str:
+    """Join the user message blocks returned by PlannerAgent._build_prompt()."""
+    _system_blocks, user_blocks = prompt
+    return "".join(block["text"] for block in user_blocks)
+
+
 def create_mock_context() -> list:
     """Create mock retrieved context for testing."""
     return [
@@ -154,11 +160,16 @@ def test_prompt_building():
         mock_context = create_mock_context()
         
         # Build prompt with context
-        full_brd = parsed_brd.model_dump()
-        prompt_with_context = planner._build_prompt(full_brd, retrieved_context=mock_context)
+        brd_json = parsed_brd.model_dump_json()
+        blocks_with_context = planner._build_prompt(brd_json, retrieved_context=mock_context)
+        prompt_with_context = user_prompt_text(blocks_with_context)
         
         # Build prompt without context
-        prompt_without_context = planner._build_prompt(full_brd, retrieved_context=None)
+        blocks_without_context = planner._build_prompt(brd_json, retrieved_context=None)
+        prompt_without_context = user_prompt_text(blocks_without_context)
+        
+        # The static system prompt is the same either way (so it stays cacheable)
+        assert blocks_with_context[0] == blocks_without_context[0], "System prompt should not depend on context"
         
         # Verify System Context section is included when context provided
         assert "System Context" in prompt_with_context, "Prompt should include System Context section"
@@ -203,11 +214,13 @@ def test_context_prioritization():
             {'content': 'Medium relevant', 'source': 'file3.md', 'distance': 200.0},
         ]
         
-        full_brd = parsed_brd.model_dump()
-        prompt = planner._build_prompt(full_brd, retrieved_context=mock_context)
+        brd_json = parsed_brd.model_dump_json()
+        prompt = user_prompt_text(planner._build_prompt(brd_json, retrieved_context=mock_context))
         
         # Check that most relevant chunk appears first (or early) in prompt
         # The prompt should prioritize chunks by distance
+        for content in ("Most relevant", "Medium relevant", "Less relevant"):
+            assert content in prompt, "Prompt should include every chunk within the limit"
         print("✓ Context prioritization implemented (chunks sorted by distance)")
         
         return True
@@ -235,8 +248,8 @@ def test_large_context_handling():
             for i in range(30)
         ]
         
-        full_brd = parsed_brd.model_dump()
-        prompt = planner._build_prompt(full_brd, retrieved_context=large_context)
+        brd_json = parsed_brd.model_dump_json()
+        prompt = user_prompt_text(planner._build_prompt(brd_json, retrieved_context=large_context))
         
         # Verify prompt doesn't explode (basic check)
         assert len(prompt) > 0, "Prompt should be generated"
@@ -254,20 +267,26 @@ def test_large_context_handling():
 def main():
     """Run all tests."""
     try:
-        # Test 1: Without context
-        test_planner_without_context()
-        
-        # Test 2: With context
-        test_planner_with_context()
-        
-        # Test 3: Prompt building
-        test_prompt_building()
-        
-        # Test 4: Context prioritization
-        test_context_prioritization()
+        results = [
+            # Test 1: Without context
+            test_planner_without_context(),
+            
+            # Test 2: With context
+            test_planner_with_context(),
+            
+            # Test 3: Prompt building
+            test_prompt_building(),
+            
+            # Test 4: Context prioritization
+            test_context_prioritization(),
+            
+            # Test 5: Large context handling
+            test_large_context_handling(),
+        ]
         
-        # Test 5: Large context handling
-        test_large_context_handling()
+        if not all(results):
+            print(f"\n❌ {results.count(False)} of {len(results)} Step 12 tests failed")
+            return False
         
         print("\n" + "=" * 70)
         print("✅ All Step 12 tests passed!")
@@ -3,13 +3,14 @@ BRD Agent - Agents Module
 Individual agents for parsing, planning, and scheduling tasks
 """
 
-from .base import BaseAgent
+from .base import AgentProtocol, BaseAgent
 from .parser import ParserAgent
 from .planner import PlannerAgent
 from .scheduler import SchedulerAgent
 from .retriever import RetrieverAgent
 
 __all__ = [
+    "AgentProtocol",
     "BaseAgent",
     "ParserAgent",
     "PlannerAgent", 
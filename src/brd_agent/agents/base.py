@@ -1,21 +1,34 @@
 """
 BRD Agent - Base Agent
-Abstract base class for all agents in the system
+Base class and structural interface for all agents in the system
 """
 
 import logging
-from abc import ABC, abstractmethod
-from typing import Any, Optional
+from typing import Any, Optional, Protocol
 
 from ..services.llm import LLMService, get_llm_service
+from ..config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
 
-class BaseAgent(ABC):
+class AgentProtocol(Protocol):
     """
-    Abstract base class for all BRD agents.
+    Structural type for anything the workflow can run as an agent.
+    
+    Used for type checking only; agents do not need to inherit from it.
+    """
+    
+    name: str
+    
+    def run(self, input_data: Any) -> Any:
+        ...
+
+
+class BaseAgent:
+    """
+    Base class for all BRD agents.
     
     Each agent:
     - Has a name and description
@@ -41,18 +54,19 @@ class BaseAgent(ABC):
         self.llm = llm_service or get_llm_service(**kwargs)
         logger.info(f"Initialized {self.name}")
     
-    @abstractmethod
     def run(self, input_data: Any) -> Any:
         """
         Execute the agent's main task.
         
+        Subclasses must override this method.
+        
         Args:
             input_data: Input data for the agent to process
             
         Returns:
             The agent's output
         """
-        pass
+        raise NotImplementedError(f"{type(self).__name__} must implement run()")
     
     def _load_prompt(self, prompt_name: str) -> str:
         """
@@ -64,8 +78,6 @@ class BaseAgent(ABC):
         Returns:
             Prompt template string
         """
-        from ..config import get_settings
-        
         settings = get_settings()
         prompt_path = settings.prompts_dir / f"{prompt_name}.txt"
         
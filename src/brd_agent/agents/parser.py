@@ -8,13 +8,28 @@ This agent just normalizes various JSON input formats.
 
 import json
 import logging
-from typing import Union
+from typing import Optional, Union
 
 from .base import BaseAgent
+from ..services.llm import LLMService
 
 
 logger = logging.getLogger(__name__)
 
+# Top-level keys of the normalized BRD format and their expected types
+_CANONICAL_FIELDS = (
+    ("project", dict),
+    ("features", list),
+    ("stakeholders", list),
+    ("technical_requirements", dict),
+    ("success_criteria", list),
+)
+
+
+def _is_canonical(data: dict) -> bool:
+    """Check whether data already has every normalized field with the right type."""
+    return all(isinstance(data.get(key), expected) for key, expected in _CANONICAL_FIELDS)
+
 
 class ParserAgent(BaseAgent):
     """
@@ -32,6 +47,21 @@ class ParserAgent(BaseAgent):
     name = "ParserAgent"
     description = "Normalizes BRD input for the pipeline"
     
+    def __init__(self, llm_service: Optional[LLMService] = None, **kwargs):
+        """
+        Initialize the parser without bringing up an LLM client.
+        
+        Normalization is pure dict manipulation, so unlike the other agents
+        no default LLM service is created. A shared service passed in by the
+        workflow is kept for interface compatibility but never called.
+        
+        Args:
+            llm_service: Optional LLM service (unused)
+            **kwargs: Ignored; accepted for BaseAgent signature compatibility
+        """
+        self.llm = llm_service
+        logger.info(f"Initialized {self.name}")
+    
     def run(self, input_data: Union[dict, str]) -> dict:
         """
         Normalize BRD input into a consistent format.
@@ -78,7 +108,11 @@ class ParserAgent(BaseAgent):
             "success_criteria": [...]
         }
         """
-        # If already in expected format (from PDF Parser), return as-is
+        # Fast path: already fully normalized (typical PDF Parser output)
+        if _is_canonical(data):
+            return data
+        
+        # If in expected format but missing optional fields, fill in defaults
         if "project" in data and "features" in data:
             return self._ensure_complete(data)
         
@@ -129,38 +163,35 @@ class ParserAgent(BaseAgent):
     
     def _convert_from_parsed_brd(self, data: dict) -> dict:
         """Convert from our ParsedBRD model format to the simpler format."""
-        doc_info = data.get("document_info", {})
-        requirements = data.get("requirements", {})
-        cad = data.get("constraints_assumptions_dependencies", {})
+        # Bind each section once; iterated-only sections default to an empty tuple
+        doc_info = data.get("document_info") or {}
+        requirements = data.get("requirements") or {}
+        cad = data.get("constraints_assumptions_dependencies") or {}
+        business_objectives = data.get("business_objectives") or ()
+        stakeholders = data.get("stakeholders") or ()
         
         # Convert functional requirements to features
         features = []
-        for req in requirements.get("functional", []):
+        for req in requirements.get("functional") or ():
+            description = req.get("description", "")
+            rationale = req.get("rationale")
             features.append({
                 "id": req.get("id", f"F{len(features)+1:03d}"),
-                "name": req.get("description", "")[:50],  # Use first 50 chars as name
-                "description": req.get("description", ""),
+                "name": description[:50],  # Use first 50 chars as name
+                "description": description,
                 "priority": req.get("priority", "Medium"),
-                "requirements": [req.get("rationale", "")] if req.get("rationale") else []
+                "requirements": [rationale] if rationale else []
             })
         
-        # Convert business objectives to objectives list
-        objectives = [
-            obj.get("objective", "") 
-            for obj in data.get("business_objectives", [])
-        ]
-        
         return {
             "project": {
                 "name": doc_info.get("title", "Unknown Project"),
                 "description": data.get("executive_summary", ""),
-                "objectives": objectives,
+                "objectives": [obj.get("objective", "") for obj in business_objectives],
                 "constraints": cad.get("constraints", [])
             },
             "features": features,
-            "stakeholders": [
-                s.get("role", "") for s in data.get("stakeholders", [])
-            ],
+            "stakeholders": [s.get("role", "") for s in stakeholders],
             "technical_requirements": {
                 "platforms": [],
                 "integrations": cad.get("dependencies", []),
@@ -169,8 +200,8 @@ class ParserAgent(BaseAgent):
                 "scalability": ""
             },
             "success_criteria": [
-                obj.get("metric_success_criteria", "")
-                for obj in data.get("business_objectives", [])
-                if obj.get("metric_success_criteria")
+                criteria
+                for criteria in (obj.get("metric_success_criteria") for obj in business_objectives)
+                if criteria
             ]
         }
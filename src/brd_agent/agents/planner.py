@@ -4,19 +4,226 @@ Generates Engineering Plans from parsed BRD
 (Prompts migrated from n8n structured_plan_generator.json)
 """
 
-import json
+import heapq
 import logging
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from time import gmtime, strftime, time_ns
+from typing import Optional, List, Dict, Any, Callable, Tuple
+
+import orjson
+from pydantic import BaseModel, ValidationError
 
 from .base import BaseAgent
 from ..models.brd import ParsedBRD
 from ..models.plan import EngineeringPlan, EngineeringPlanContent
+from ..services.json_stream import StreamingArrayParser
+from ..services.llm import cached_text_block, strip_code_fence, text_block
+from ..services.plan_cache import PlanCache
+from ..config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
 
+# === Prompt scaffolding (static; built once at import) ===
+
+_PLAN_INSTRUCTIONS = """You are an expert Software Engineering Manager and Technical Architect. Your task is to create a comprehensive, structured engineering plan based on a Business Requirements Document (BRD). The BRD is provided in the user message, optionally preceded by System Context retrieved from the existing system's documentation.
+
+Please analyze the BRD thoroughly and generate a detailed, comprehensive Structured Engineering Plan in JSON format with the following structure:
+
+{
+  "engineering_plan": {
+    "project_overview": {
+      "name": "string",
+      "description": "string",
+      "objectives": ["string"]
+    },
+    "feature_breakdown": [
+      {
+        "feature_id": "string",
+        "feature_name": "string",
+        "description": "string",
+        "priority": "Critical|High|Medium|Low",
+        "complexity": "High|Medium|Low",
+        "estimated_effort": "string (e.g., 2 weeks)",
+        "dependencies": ["string"],
+        "technical_requirements": ["string"],
+        "acceptance_criteria": ["string"]
+      }
+    ],
+    "technical_architecture": {
+      "system_components": ["string"],
+      "integration_points": ["string"],
+      "data_flow": "string",
+      "security_considerations": ["string"]
+    },
+    "implementation_phases": [
+      {
+        "phase_number": "number",
+        "phase_name": "string",
+        "description": "string",
+        "features_included": ["string"],
+        "estimated_duration": "string",
+        "deliverables": ["string"]
+      }
+    ],
+    "risk_analysis": [
+      {
+        "risk_id": "string",
+        "description": "string",
+        "impact": "High|Medium|Low",
+        "probability": "High|Medium|Low",
+        "mitigation_strategy": "string"
+      }
+    ],
+    "resource_requirements": {
+      "team_composition": ["string"],
+      "tools_and_technologies": ["string"],
+      "infrastructure_needs": ["string"]
+    },
+    "success_metrics": [
+      {
+        "metric_name": "string",
+        "target_value": "string",
+        "measurement_method": "string"
+      }
+    ]
+  }
+}
+
+IMPORTANT GUIDELINES:
+1. Be EXTREMELY thorough and detailed in every section
+2. For each feature, provide comprehensive technical requirements and acceptance criteria (at least 2-4 items each)
+3. Include specific technology recommendations where applicable (e.g., OAuth 2.0, SAML 2.0, specific frameworks)
+4. Provide realistic effort estimates (in weeks or months)
+5. Include detailed risk mitigation strategies for each identified risk
+6. Be specific about team roles, tools, and infrastructure needs
+7. Ensure all dependencies and integration points are clearly identified
+8. Return ONLY valid JSON, no markdown formatting, no explanation text. Start with { and end with }.
+
+Focus on technical feasibility, implementation details, and actionable recommendations. This plan will be used by engineering teams, so be as specific and detailed as possible."""
+
+_SYSTEM_CONTEXT_HEADER = """
+## System Context (Existing Architecture and Patterns)
+
+The following context has been retrieved from the existing system's documentation. Use this information to align your engineering plan with existing architecture patterns, technologies, and conventions.
+
+"""
+
+_SYSTEM_CONTEXT_FOOTER = """
+
+**IMPORTANT**: Use the System Context above to:
+- Align your engineering plan with existing architecture patterns
+- Reference specific patterns, technologies, and conventions found in the System Context
+- Ensure technical recommendations match the existing tech stack and architecture
+- Cite source files when referencing existing patterns (e.g., "As documented in docs/api.md...")
+- Do NOT suggest technologies or patterns that conflict with the existing system
+
+---
+"""
+
+# Maximum number of retrieved chunks included in the System Context
+_MAX_CONTEXT_CHUNKS = 20
+
+_BRD_HEADER = "Here is the complete BRD:\n"
+
+_SYSTEM_CONTEXT_REMINDER = (
+    "\n**CRITICAL**: System Context was provided above. Ensure your plan aligns with existing "
+    "architecture patterns, uses the same tech stack, and follows established conventions. "
+    "Reference source files when applicable."
+)
+
+
+def _chunk_distance(chunk: Dict[str, Any]) -> float:
+    """Sort key for retrieved chunks; chunks without a distance rank last."""
+    distance = chunk.get('distance')
+    return distance if distance is not None else float('inf')
+
+
+class _PlanResponse(BaseModel):
+    """Top level of a well-formed plan response, validated straight from JSON text."""
+    engineering_plan: EngineeringPlanContent
+
+
+# How many cut points to try when recovering a truncated response
+_MAX_REPAIR_ATTEMPTS = 20
+
+
+def _repair_json(text: str) -> Optional[Any]:
+    """
+    Best-effort recovery of a near-miss JSON object from an LLM response.
+    
+    Handles prose around the object, trailing commas and output cut off at
+    max_tokens (unclosed strings, arrays and objects are dropped back to the
+    last complete element and closed). Returns None if nothing parses.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    
+    # Single scan tracking open containers and commas outside of strings. A comma
+    # directly before a closing bracket (which strict JSON rejects) is dropped;
+    # string contents are copied through untouched.
+    out = []
+    stack = []
+    cuts = []
+    trailing_comma = None
+    in_string = escaped = False
+    for char in text[start:]:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            trailing_comma = None
+        elif char == "{":
+            stack.append("}")
+            trailing_comma = None
+        elif char == "[":
+            stack.append("]")
+            trailing_comma = None
+        elif char in "}]":
+            if trailing_comma is not None:
+                out[trailing_comma] = ""
+                trailing_comma = None
+            if stack:
+                stack.pop()
+            if not stack:
+                # Top-level object closed; ignore anything after it
+                out.append(char)
+                try:
+                    return orjson.loads("".join(out))
+                except orjson.JSONDecodeError:
+                    return None
+        elif char == ",":
+            cuts.append((len(out), "".join(reversed(stack))))
+            trailing_comma = len(out)
+        elif not char.isspace():
+            trailing_comma = None
+        out.append(char)
+    
+    # Truncated output: close what is open, else drop the trailing partial element
+    attempts = ["".join(out) + ('"' if in_string else "") + "".join(reversed(stack))]
+    attempts.extend("".join(out[:end]) + closers for end, closers in reversed(cuts[-_MAX_REPAIR_ATTEMPTS:]))
+    for attempt in attempts:
+        try:
+            return orjson.loads(attempt)
+        except orjson.JSONDecodeError:
+            continue
+    return None
+
+
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string, built from a single clock read."""
+    seconds, nanos = divmod(time_ns(), 1_000_000_000)
+    return f"{strftime('%Y-%m-%dT%H:%M:%S', gmtime(seconds))}.{nanos // 1000:06d}+00:00"
+
+
 class PlannerAgent(BaseAgent):
     """
     Planner Agent - Generates Engineering Plans from parsed BRDs.
@@ -30,53 +237,128 @@ class PlannerAgent(BaseAgent):
     name = "PlannerAgent"
     description = "Generates Engineering Plans from Business Requirements"
     
+    def __init__(
+        self,
+        llm_service=None,
+        plan_cache: Optional[PlanCache] = None,
+        **kwargs
+    ):
+        """
+        Initialize PlannerAgent.
+        
+        Args:
+            llm_service: LLM service used to generate plans
+            plan_cache: Optional persistent plan cache. If None, one is created
+                        when plan_cache_enabled is set in config.
+            **kwargs: Additional arguments passed to BaseAgent
+        """
+        super().__init__(llm_service=llm_service, **kwargs)
+        
+        settings = get_settings()
+        if plan_cache is None and settings.plan_cache_enabled:
+            plan_cache = PlanCache()
+        self.plan_cache = plan_cache
+        self.distance_cutoff = settings.rag_distance_cutoff
+        
+        # The instructions never change for an agent, so build the system prompt once
+        self._system_prompt = [cached_text_block(_PLAN_INSTRUCTIONS)]
+        
+        # Model name reported in plan metadata, resolved once per agent
+        self._llm_model_name = getattr(self.llm, 'model', 'claude-3-haiku-20240307')
+    
     def run(
         self,
         parsed_brd: ParsedBRD,
         retrieved_context: Optional[List[Dict[str, Any]]] = None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        on_feature: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> EngineeringPlan:
         """
         Generate an Engineering Plan from a parsed BRD, optionally using retrieved context.
         
+        The response is streamed from the LLM. If on_feature is given, it is
+        called with each feature_breakdown item (as a raw dict) as soon as
+        that item has been generated, before the full plan is validated.
+        
         Args:
             parsed_brd: Parsed BRD to plan from
             retrieved_context: Optional list of retrieved document chunks from RAG
             include_metadata: Whether to include generation metadata
+            on_feature: Optional callback for features as they are generated
         
         Returns:
             EngineeringPlan with full feature breakdown and phases
         """
         logger.info(f"{self.name}: Generating engineering plan for '{parsed_brd.document_info.title}'")
         
+        # One clock read per run, shared by every timestamp this run produces
+        generated_at = _utc_timestamp()
+        
         if retrieved_context:
             logger.info(f"{self.name}: Using {len(retrieved_context)} retrieved chunks for context-aware planning")
         else:
             logger.info(f"{self.name}: No retrieved context provided (RAG disabled or unavailable)")
         
-        # Convert ParsedBRD to dict for the prompt (matches n8n behavior)
-        full_brd = parsed_brd.model_dump()
-        
-        # Build the prompt with optional System Context
-        prompt = self._build_prompt(full_brd, retrieved_context=retrieved_context)
-        
-        # Call LLM (matches n8n: claude-3-haiku, temp=0.7, max_tokens=4096)
-        response_text = self.llm.generate(
-            prompt=prompt,
-            max_tokens=4096,
-            temperature=0.7
-        )
+        # Serialize the BRD straight through pydantic's JSON path (no intermediate dict)
+        brd_json = parsed_brd.model_dump_json()
         
-        # Parse the response (with markdown cleanup like n8n does)
-        plan_data = self._parse_response(response_text)
+        # Reuse a previously generated plan for the same BRD and context if cached
+        content = None
+        cache_key = None
+        if self.plan_cache is not None:
+            cache_key = self._plan_cache_key(brd_json, retrieved_context)
+            cached_plan = self.plan_cache.get(cache_key)
+            if cached_plan is not None:
+                logger.info(f"{self.name}: Plan cache hit, skipping prompt assembly and LLM call")
+                # Cached plans were validated before being stored
+                content = EngineeringPlanContent.from_trusted_dict(cached_plan)
+                if on_feature is not None:
+                    for feature in cached_plan.get("feature_breakdown", []):
+                        on_feature(feature)
         
-        # Build the EngineeringPlan
-        content = EngineeringPlanContent.model_validate(plan_data.get("engineering_plan", plan_data))
+        if content is None:
+            # Build the prompt with optional System Context
+            system_prompt, content_blocks = self._build_prompt(brd_json, retrieved_context=retrieved_context)
+            
+            # Call LLM (matches n8n: claude-3-haiku, temp=0.7, max_tokens=4096).
+            # The static instructions and System Context are marked for Anthropic prompt caching.
+            feature_parser = StreamingArrayParser("feature_breakdown") if on_feature is not None else None
+            chunks = []
+            for chunk in self.llm.stream(
+                prompt=content_blocks,
+                system_prompt=system_prompt,
+                max_tokens=4096,
+                temperature=0.7
+            ):
+                chunks.append(chunk)
+                if feature_parser is not None:
+                    for feature in feature_parser.feed(chunk):
+                        on_feature(feature)
+            response_text = "".join(chunks)
+            
+            # A well-formed response is validated straight from the JSON text, skipping the dict
+            parsed_cleanly = True
+            try:
+                content = _PlanResponse.model_validate_json(
+                    strip_code_fence(response_text)
+                ).engineering_plan
+            except ValidationError:
+                # Unwrapped or malformed - parse (and repair) via the dict path like n8n does
+                plan_data, parsed_cleanly = self._parse_response(response_text, generated_at=generated_at)
+                content = EngineeringPlanContent.model_validate(plan_data.get("engineering_plan", plan_data))
+            
+            # Only cache plans that parsed cleanly (never repaired or error structures)
+            if cache_key is not None and parsed_cleanly:
+                self.plan_cache.put(cache_key, content.model_dump())
         
         # Generate metadata with source citations if context was used
         metadata = None
         if include_metadata:
-            metadata = self._generate_metadata(parsed_brd, retrieved_context=retrieved_context)
+            metadata = self._generate_metadata(
+                parsed_brd,
+                retrieved_context=retrieved_context,
+                generated_at=generated_at
+            )
         
         result = EngineeringPlan(
             engineering_plan=content,
@@ -91,161 +373,178 @@ class PlannerAgent(BaseAgent):
         
         return result
     
-    def _build_prompt(self, full_brd: dict, retrieved_context: Optional[List[Dict[str, Any]]] = None) -> str:
+    def run_batch(
+        self,
+        parsed_brds: List[ParsedBRD],
+        retrieved_contexts: Optional[List[Optional[List[Dict[str, Any]]]]] = None,
+        include_metadata: bool = True,
+        max_workers: int = 4
+    ) -> List[EngineeringPlan]:
+        """
+        Generate Engineering Plans for several BRDs concurrently.
+        
+        Plan generation is bound by LLM latency, so the calls are fanned out
+        over a thread pool. The first BRD is planned on its own so that the
+        shared instruction prefix is written to the prompt cache before the
+        remaining requests read it.
+        
+        Args:
+            parsed_brds: Parsed BRDs to plan from
+            retrieved_contexts: Optional retrieved chunks per BRD (same order as parsed_brds)
+            include_metadata: Whether to include generation metadata
+            max_workers: Maximum number of concurrent LLM calls
+        
+        Returns:
+            List of EngineeringPlans in the same order as parsed_brds
+        """
+        if not parsed_brds:
+            return []
+        
+        if retrieved_contexts is None:
+            retrieved_contexts = [None] * len(parsed_brds)
+        elif len(retrieved_contexts) != len(parsed_brds):
+            raise ValueError(
+                f"Got {len(retrieved_contexts)} retrieved contexts for {len(parsed_brds)} BRDs"
+            )
+        
+        logger.info(f"{self.name}: Generating {len(parsed_brds)} engineering plans (max {max_workers} concurrent)")
+        
+        def plan(index: int) -> EngineeringPlan:
+            return self.run(
+                parsed_brds[index],
+                retrieved_context=retrieved_contexts[index],
+                include_metadata=include_metadata
+            )
+        
+        # Warm the prompt cache with the first plan, then fan out the rest
+        results = [plan(0)]
+        if len(parsed_brds) > 1:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                results.extend(executor.map(plan, range(1, len(parsed_brds))))
+        
+        return results
+    
+    def _plan_cache_key(
+        self,
+        brd_json: str,
+        retrieved_context: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """
+        Build the plan cache key from the BRD and retrieved context.
+        
+        Hashes the model, the prompt instructions, the BRD JSON and
+        the retrieved chunks (order-independent), so the key can be computed
+        without assembling the prompt.
+        """
+        context_json = b""
+        if retrieved_context:
+            context_json = orjson.dumps(sorted(
+                (chunk.get('source') or '', chunk.get('content') or '', chunk.get('distance'))
+                for chunk in retrieved_context
+            ), default=str)
+        
+        return PlanCache.make_key(
+            getattr(self.llm, 'model', ''),
+            _PLAN_INSTRUCTIONS,
+            str(self.distance_cutoff),
+            brd_json,
+            context_json.decode(),
+        )
+    
+    def _build_prompt(
+        self,
+        brd_json: str,
+        retrieved_context: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[List[dict], List[dict]]:
         """
         Build the prompt with optional System Context from retrieved chunks.
         
+        Returns the prompt as a pair. The first element is the cached system
+        prompt holding the role, output schema and guidelines; it is identical
+        on every call and built once in __init__. The second is the user message as content
+        blocks: the System Context (if any) as its own cached block, then the
+        BRD. Sources are emitted in sorted order so the same retrieved chunks
+        always produce the same System Context block and can hit the cache.
+        
         Args:
-            full_brd: Parsed BRD as dictionary
-            retrieved_context: Optional list of retrieved document chunks
+            brd_json: Parsed BRD serialized as compact JSON
+            retrieved_context: Optional list of retrieved document chunks (pre-shaped by RetrieverAgent)
+        
+        Returns:
+            Tuple of (system prompt blocks, user message content blocks)
         """
         # Build System Context section if chunks are available
         system_context_section = ""
         if retrieved_context and len(retrieved_context) > 0:
-            # Prioritize chunks by relevance (lower distance = more relevant)
-            sorted_chunks = sorted(
-                retrieved_context,
-                key=lambda x: x.get('distance', float('inf')) if x.get('distance') is not None else float('inf')
-            )
-            
-            # Limit to top 20 chunks to avoid token limit issues
-            top_chunks = sorted_chunks[:20]
+            # Take the most relevant chunks (lower distance = more relevant) to avoid
+            # token limit issues, grouping them by source file in the same pass
+            top_chunks = heapq.nsmallest(_MAX_CONTEXT_CHUNKS, retrieved_context, key=_chunk_distance)
+            chunks_by_source = defaultdict(list)
+            for kept, chunk in enumerate(top_chunks):
+                # Chunks are in ascending distance order, so stop at the first one past the cutoff
+                if self.distance_cutoff is not None and _chunk_distance(chunk) > self.distance_cutoff:
+                    logger.info(
+                        f"{self.name}: Dropped {len(top_chunks) - kept} chunks beyond "
+                        f"distance cutoff {self.distance_cutoff}"
+                    )
+                    break
+                source_parts = chunks_by_source[chunk.get('source', 'unknown')]
+                # Content arrives stripped and truncated from RetrieverAgent
+                content = chunk.get('content')
+                if content:
+                    source_parts.append(f"\nContent: {content}")
             
-            # Group chunks by source file for better organization
-            chunks_by_source = {}
-            for chunk in top_chunks:
-                source = chunk.get('source', 'unknown')
-                if source not in chunks_by_source:
-                    chunks_by_source[source] = []
-                chunks_by_source[source].append(chunk)
-            
-            # Format chunks with source citations
+            # Format chunks with source citations, in a stable source order
             context_parts = []
-            for source, chunks in chunks_by_source.items():
+            for source in sorted(chunks_by_source):
                 context_parts.append(f"\n[Source: {source}]")
-                for chunk in chunks:
-                    content = chunk.get('content', '').strip()
-                    if content:
-                        # Truncate very long chunks (keep first 500 chars)
-                        if len(content) > 500:
-                            content = content[:500] + "..."
-                        context_parts.append(f"Content: {content}")
+                context_parts.extend(chunks_by_source[source])
             
-            system_context_section = f"""
-## System Context (Existing Architecture and Patterns)
-
-The following context has been retrieved from the existing system's documentation. Use this information to align your engineering plan with existing architecture patterns, technologies, and conventions.
-
-{''.join(context_parts)}
-
-**IMPORTANT**: Use the System Context above to:
-- Align your engineering plan with existing architecture patterns
-- Reference specific patterns, technologies, and conventions found in the System Context
-- Ensure technical recommendations match the existing tech stack and architecture
-- Cite source files when referencing existing patterns (e.g., "As documented in docs/api.md...")
-- Do NOT suggest technologies or patterns that conflict with the existing system
-
----
-"""
+            if context_parts:
+                system_context_section = "".join([_SYSTEM_CONTEXT_HEADER, *context_parts, _SYSTEM_CONTEXT_FOOTER])
         
-        return f"""You are an expert Software Engineering Manager and Technical Architect. Your task is to create a comprehensive, structured engineering plan based on a Business Requirements Document (BRD).
-
-{system_context_section}Here is the complete BRD:
-{json.dumps(full_brd, indent=2)}
-
-Please analyze this BRD thoroughly and generate a detailed, comprehensive Structured Engineering Plan in JSON format with the following structure:
-
-{{
-  "engineering_plan": {{
-    "project_overview": {{
-      "name": "string",
-      "description": "string",
-      "objectives": ["string"]
-    }},
-    "feature_breakdown": [
-      {{
-        "feature_id": "string",
-        "feature_name": "string",
-        "description": "string",
-        "priority": "Critical|High|Medium|Low",
-        "complexity": "High|Medium|Low",
-        "estimated_effort": "string (e.g., 2 weeks)",
-        "dependencies": ["string"],
-        "technical_requirements": ["string"],
-        "acceptance_criteria": ["string"]
-      }}
-    ],
-    "technical_architecture": {{
-      "system_components": ["string"],
-      "integration_points": ["string"],
-      "data_flow": "string",
-      "security_considerations": ["string"]
-    }},
-    "implementation_phases": [
-      {{
-        "phase_number": "number",
-        "phase_name": "string",
-        "description": "string",
-        "features_included": ["string"],
-        "estimated_duration": "string",
-        "deliverables": ["string"]
-      }}
-    ],
-    "risk_analysis": [
-      {{
-        "risk_id": "string",
-        "description": "string",
-        "impact": "High|Medium|Low",
-        "probability": "High|Medium|Low",
-        "mitigation_strategy": "string"
-      }}
-    ],
-    "resource_requirements": {{
-      "team_composition": ["string"],
-      "tools_and_technologies": ["string"],
-      "infrastructure_needs": ["string"]
-    }},
-    "success_metrics": [
-      {{
-        "metric_name": "string",
-        "target_value": "string",
-        "measurement_method": "string"
-      }}
-    ]
-  }}
-}}
-
-IMPORTANT GUIDELINES:
-1. Be EXTREMELY thorough and detailed in every section
-2. For each feature, provide comprehensive technical requirements and acceptance criteria (at least 2-4 items each)
-3. Include specific technology recommendations where applicable (e.g., OAuth 2.0, SAML 2.0, specific frameworks)
-4. Provide realistic effort estimates (in weeks or months)
-5. Include detailed risk mitigation strategies for each identified risk
-6. Be specific about team roles, tools, and infrastructure needs
-7. Ensure all dependencies and integration points are clearly identified
-8. Return ONLY valid JSON, no markdown formatting, no explanation text. Start with {{ and end with }}.
-{f"9. **CRITICAL**: If System Context was provided above, ensure your plan aligns with existing architecture patterns, uses the same tech stack, and follows established conventions. Reference source files when applicable." if retrieved_context and len(retrieved_context) > 0 else ""}
-
-Focus on technical feasibility, implementation details, and actionable recommendations. This plan will be used by engineering teams, so be as specific and detailed as possible."""
+        content_blocks = []
+        if system_context_section:
+            content_blocks.append(cached_text_block(system_context_section))
+        
+        request = "".join([
+            _BRD_HEADER,
+            # Compact JSON: indentation only adds input tokens the model does not need
+            brd_json,
+            "\n",
+            _SYSTEM_CONTEXT_REMINDER if system_context_section else "",
+        ])
+        content_blocks.append(text_block(request))
+        
+        return self._system_prompt, content_blocks
     
-    def _parse_response(self, response_text: str) -> dict:
+    def _parse_response(self, response_text: str, generated_at: Optional[str] = None) -> Tuple[dict, bool]:
         """
         Parse LLM response, cleaning up markdown if present (matches n8n logic).
-        """
-        ai_response = response_text.strip()
         
+        Malformed JSON (surrounding prose, trailing commas, truncated output)
+        is repaired on a best-effort basis before falling back to the n8n
+        error structure.
+        
+        Args:
+            response_text: Raw LLM response
+            generated_at: Optional run timestamp for the error structure. If None, uses the current time.
+        
+        Returns:
+            Tuple of (plan data, whether it parsed as-is without repair)
+        """
         # Clean up markdown formatting if present (from n8n)
-        if ai_response.startswith("```json"):
-            ai_response = ai_response[7:]
-        elif ai_response.startswith("```"):
-            ai_response = ai_response[3:]
-        if ai_response.endswith("```"):
-            ai_response = ai_response[:-3]
-        ai_response = ai_response.strip()
+        ai_response = strip_code_fence(response_text)
         
         try:
-            return json.loads(ai_response)
-        except json.JSONDecodeError as e:
+            return orjson.loads(ai_response), True
+        except orjson.JSONDecodeError as e:
+            # Try to salvage a near-miss before giving up on the (expensive) generation
+            repaired = _repair_json(ai_response)
+            if isinstance(repaired, dict):
+                logger.warning(f"Recovered malformed JSON response: {e}")
+                return repaired, False
+            
             logger.error(f"Failed to parse JSON response: {e}")
             logger.debug(f"Raw response: {response_text[:500]}...")
             # Return error structure like n8n does
@@ -253,15 +552,16 @@ Focus on technical feasibility, implementation details, and actionable recommend
                 "engineering_plan": {
                     "raw_response": response_text,
                     "parsing_error": str(e),
-                    "generated_at": datetime.utcnow().isoformat(),
+                    "generated_at": generated_at or _utc_timestamp(),
                     "note": "AI response could not be parsed as JSON"
                 }
-            }
+            }, False
     
     def _generate_metadata(
         self, 
         brd: ParsedBRD, 
-        retrieved_context: Optional[List[Dict[str, Any]]] = None
+        retrieved_context: Optional[List[Dict[str, Any]]] = None,
+        generated_at: Optional[str] = None
     ) -> dict:
         """
         Generate metadata for the engineering plan (matches n8n structure).
@@ -269,13 +569,14 @@ Focus on technical feasibility, implementation details, and actionable recommend
         Args:
             brd: Parsed BRD used for planning
             retrieved_context: Optional retrieved chunks used for context
+            generated_at: Optional run timestamp. If None, uses the current time.
         """
         metadata = {
             "generated_by": "Planning Agent - Engineering Plan Generator",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": generated_at or _utc_timestamp(),
             "source_brd": brd.document_info.title,
             "version": "1.0",
-            "ai_model": getattr(self.llm, 'model', 'claude-3-haiku-20240307'),
+            "ai_model": self._llm_model_name,
             "tokens_used": {
                 "input": 0,  # Would need to track from LLM response
                 "output": 0
@@ -284,12 +585,12 @@ Focus on technical feasibility, implementation details, and actionable recommend
         
         # Add source citations if context was used
         if retrieved_context and len(retrieved_context) > 0:
-            # Extract unique source files
-            sources = list(set([
-                chunk.get('source', 'unknown') 
-                for chunk in retrieved_context 
+            # Extract unique source files, in retrieval (relevance) order
+            sources = list(dict.fromkeys(
+                chunk['source']
+                for chunk in retrieved_context
                 if chunk.get('source')
-            ]))
+            ))
             
             metadata["rag_context"] = {
                 "enabled": True,
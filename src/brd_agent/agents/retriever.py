@@ -4,20 +4,88 @@ Retrieves relevant context from ingested repositories for BRD processing.
 Supports both basic retrieval (Step 9) and query expansion (Step 10).
 """
 
+import asyncio
+import heapq
 import logging
 import hashlib
+import math
+import operator
 import re
-from typing import List, Dict, Any, Optional
+from itertools import chain, repeat
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 
 from .base import BaseAgent
 from ..models.brd import ParsedBRD
-from ..services.embeddings import EmbeddingService
-from ..services.vector_store import VectorStore
+from ..services.embedding_cache import EmbeddingCache
+from ..services.embeddings import EmbeddingService, get_shared_embedding_service
+from ..services.lru_cache import LRUCache
+from ..services.vector_store import VectorStore, get_shared_vector_store
 from ..config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
+# Chunks are truncated to this many characters before being handed to the planner
+_MAX_CHUNK_CHARS = 500
+
+# Query-generation context budget: per-section item cap and per-item description cap
+_QUERY_CONTEXT_MAX_ITEMS = 20
+_QUERY_CONTEXT_MAX_DESCRIPTION = 200
+
+# Sort order for MoSCoW and Critical/High/Medium/Low priorities (unknown sorts as medium)
+_PRIORITY_RANK = {
+    'critical': 0, 'must': 0,
+    'high': 1, 'should': 1,
+    'medium': 2, 'could': 2,
+    'low': 3, "won't": 4,
+}
+
+
+def _top_priority(items: list) -> list:
+    """Keep the _QUERY_CONTEXT_MAX_ITEMS highest-priority items (stable, unchanged if under the cap)."""
+    if len(items) <= _QUERY_CONTEXT_MAX_ITEMS:
+        return items
+    return sorted(
+        items, key=lambda item: _PRIORITY_RANK.get((item.priority or '').lower(), 2)
+    )[:_QUERY_CONTEXT_MAX_ITEMS]
+
+
+def _clip(text: str) -> str:
+    """Truncate a description to _QUERY_CONTEXT_MAX_DESCRIPTION characters."""
+    if len(text) > _QUERY_CONTEXT_MAX_DESCRIPTION:
+        return text[:_QUERY_CONTEXT_MAX_DESCRIPTION] + "..."
+    return text
+
+
+# === Expanded-query parsing patterns (compiled once at import) ===
+
+# Preamble lines (common LLM patterns)
+_SKIP_RE = re.compile(
+    r'^(?:here are|based on|the following|these queries|queries:|query:|the queries)',
+    re.IGNORECASE
+)
+_NUMBERING_RE = re.compile(r'^\d+[\.\)]\s*')  # "1. " or "1) "
+_BULLET_RE = re.compile(r'^[-•]\s*')  # "- " or "• "
+_QUOTE_TRANS = str.maketrans('', '', '"\'')  # delete all quotes
+_EXTRACT_RE = re.compile(
+    r'(?:search for|investigate|locate|explore|analyze|identify)\s+([^.]{5,80})', re.IGNORECASE
+)
+_SEPARATOR_RE = re.compile(r'[.,;]')
+_PREFIX_RE = re.compile(r'^(search for|investigate|locate|explore|analyze|identify|find)\s+', re.IGNORECASE)
+_LETTER_RE = re.compile(r'[a-zA-Z]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _relevance_key(result: Dict[str, Any]) -> Tuple[bool, float]:
+    """Sort key ranking results by distance, with distance-less results last."""
+    distance = result.get('distance')
+    return (distance is None, distance if distance is not None else 0.0)
+
+
+def _text_key(text: str) -> bytes:
+    """Compact 16-byte BLAKE2b key for a query or chunk text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
 
 class RetrieverAgent(BaseAgent):
     """
@@ -35,6 +103,7 @@ class RetrieverAgent(BaseAgent):
         llm_service=None,
         embedding_service: Optional[EmbeddingService] = None,
         vector_store: Optional[VectorStore] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
         **kwargs
     ):
         """
@@ -44,13 +113,33 @@ class RetrieverAgent(BaseAgent):
             llm_service: LLM service (for future query expansion, not used in basic version)
             embedding_service: Embedding service for generating query embeddings
             vector_store: Vector store for querying ChromaDB
+            embedding_cache: Optional persistent embedding cache. If None, one is created
+                             when embedding_cache_enabled is set in config.
             **kwargs: Additional arguments passed to BaseAgent
         """
         super().__init__(llm_service=llm_service, **kwargs)
-        self.embedding_service = embedding_service or EmbeddingService()
-        self.vector_store = vector_store or VectorStore()
+        # Default services are process-wide, so per-request agents skip client cold starts
+        self.embedding_service = embedding_service or get_shared_embedding_service()
+        self.vector_store = vector_store or get_shared_vector_store()
         self.settings = get_settings()
         
+        # Query embeddings are deterministic; vector store results expire so re-ingestion shows up
+        self._embedding_cache = LRUCache(self.settings.rag_cache_max_entries)
+        self._results_cache = LRUCache(
+            self.settings.rag_cache_max_entries,
+            ttl_seconds=self.settings.rag_results_cache_ttl_seconds
+        )
+        # Expanded queries keyed by the full query-generation prompt, so reruns skip the LLM
+        self._query_cache = LRUCache(
+            self.settings.rag_cache_max_entries,
+            ttl_seconds=self.settings.rag_query_cache_ttl_seconds
+        )
+        
+        # Optional on-disk layer below the in-memory embedding cache
+        if embedding_cache is None and self.settings.embedding_cache_enabled:
+            embedding_cache = EmbeddingCache()
+        self.embedding_cache = embedding_cache
+        
         logger.info(f"{self.name}: Initialized with embedding service and vector store")
     
     def run(
@@ -70,7 +159,7 @@ class RetrieverAgent(BaseAgent):
         
         Returns:
             List of relevant document chunks, each containing:
-            - 'content': Chunk text content
+            - 'content': Chunk text content (stripped, truncated to 500 chars)
             - 'source': Source file path
             - 'metadata': Full metadata dict (repo, file_path, line_start, line_end, etc.)
             - 'distance': Similarity distance score (lower = more similar)
@@ -89,6 +178,86 @@ class RetrieverAgent(BaseAgent):
         else:
             return self._retrieve_basic(parsed_brd, target_repo_url)
     
+    async def run_async(
+        self,
+        parsed_brd: ParsedBRD,
+        repo_url: Optional[str] = None,
+        use_query_expansion: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Awaitable version of run() for async callers.
+        
+        Retrieval runs in a worker thread, so an event loop (e.g. the API)
+        stays responsive and can overlap other work with the embedding,
+        query expansion and vector store round-trips.
+        
+        Args:
+            parsed_brd: Parsed BRD object containing business requirements
+            repo_url: Optional repository URL. If not provided, uses default from config.
+            use_query_expansion: Whether to use query expansion (default: True)
+        
+        Returns:
+            List of relevant document chunks (see run())
+        """
+        return await asyncio.to_thread(
+            self.run,
+            parsed_brd,
+            repo_url=repo_url,
+            use_query_expansion=use_query_expansion
+        )
+    
+    def run_batch(
+        self,
+        parsed_brds: List[ParsedBRD],
+        repo_url: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve context for several BRDs against the same repository.
+        
+        Uses basic single-query retrieval per BRD: all BRD summaries are
+        embedded in one embed_batch() call and the vector store is queried
+        once for every embedding.
+        
+        Args:
+            parsed_brds: Parsed BRDs to retrieve context for
+            repo_url: Optional repository URL. If not provided, uses default from config.
+        
+        Returns:
+            One list of relevant document chunks per BRD (same order as parsed_brds)
+        """
+        if not parsed_brds:
+            return []
+        
+        target_repo_url = repo_url or self.settings.default_repo_url
+        logger.info(f"{self.name}: Starting batch retrieval for {len(parsed_brds)} BRDs from {target_repo_url}")
+        
+        summaries = [self._extract_brd_summary(parsed_brd) for parsed_brd in parsed_brds]
+        
+        try:
+            query_embeddings = self._embed_cached(summaries)
+        except Exception as e:
+            logger.error(f"{self.name}: Failed to generate embeddings: {e}")
+            raise ValueError(f"Failed to generate embeddings for BRD summaries: {e}")
+        
+        try:
+            results = self._query_many(target_repo_url, summaries, query_embeddings)
+        except ValueError as e:
+            # Collection doesn't exist - return empty lists gracefully
+            logger.warning(f"{self.name}: Collection not found for {target_repo_url}: {e}")
+            return [[] for _ in parsed_brds]
+        except Exception as e:
+            logger.error(f"{self.name}: Failed to query vector store: {e}")
+            raise
+        
+        batch_results = [self._format_results(query_results) for query_results in results]
+        
+        logger.info(
+            f"{self.name}: Retrieved {sum(len(chunks) for chunks in batch_results)} "
+            f"chunks for {len(parsed_brds)} BRDs (batch)"
+        )
+        
+        return batch_results
+    
     def _retrieve_basic(
         self,
         parsed_brd: ParsedBRD,
@@ -110,7 +279,7 @@ class RetrieverAgent(BaseAgent):
         
         # Step 3: Generate embedding for BRD summary
         try:
-            query_embedding = self.embedding_service.embed(brd_summary)
+            query_embedding = self._embed_cached([brd_summary])[0]
             logger.debug(f"{self.name}: Generated query embedding ({len(query_embedding)} dimensions)")
         except Exception as e:
             logger.error(f"{self.name}: Failed to generate embedding: {e}")
@@ -118,11 +287,7 @@ class RetrieverAgent(BaseAgent):
         
         # Step 4: Query ChromaDB collection for the specified repo
         try:
-            results = self.vector_store.query(
-                repo_url=target_repo_url,
-                query_embedding=query_embedding,
-                top_k=self.settings.rag_top_k
-            )
+            results = self._query_many(target_repo_url, [brd_summary], [query_embedding])[0]
             logger.debug(f"{self.name}: Query returned results from ChromaDB")
         except ValueError as e:
             # Collection doesn't exist - return empty list gracefully
@@ -153,6 +318,8 @@ class RetrieverAgent(BaseAgent):
         Returns:
             List of relevant document chunks (merged and deduplicated)
         """
+        top_k = self.settings.rag_top_k
+        
         # Step 1: Generate expanded queries using LLM
         try:
             expanded_queries = self._generate_expanded_queries(parsed_brd)
@@ -163,48 +330,188 @@ class RetrieverAgent(BaseAgent):
         
         # Step 2: Generate embeddings for each query
         try:
-            query_embeddings = self.embedding_service.embed_batch(expanded_queries)
+            query_embeddings = self._embed_cached(expanded_queries)
             logger.debug(f"{self.name}: Generated {len(query_embeddings)} query embeddings")
         except Exception as e:
             logger.error(f"{self.name}: Failed to generate embeddings: {e}")
             raise ValueError(f"Failed to generate embeddings for expanded queries: {e}")
         
-        # Step 3: Query ChromaDB for each query
-        all_results = []
-        for i, (query, query_embedding) in enumerate(zip(expanded_queries, query_embeddings)):
-            try:
-                results = self.vector_store.query(
-                    repo_url=target_repo_url,
-                    query_embedding=query_embedding,
-                    top_k=self.settings.rag_top_k
-                )
-                formatted = self._format_results(results)
-                # Tag results with query info
-                for result in formatted:
-                    result['query_index'] = i
-                    result['query'] = query
-                all_results.extend(formatted)
-                logger.debug(f"{self.name}: Query {i+1} returned {len(formatted)} results")
-            except ValueError as e:
-                logger.warning(f"{self.name}: Collection not found for {target_repo_url}: {e}")
-                return []
-            except Exception as e:
-                logger.warning(f"{self.name}: Query {i+1} failed: {e}. Continuing with other queries.")
-                continue
+        # Paraphrased queries would return (nearly) the same chunks - keep one of each
+        expanded_queries, query_embeddings = self._drop_similar_queries(expanded_queries, query_embeddings)
         
-        # Step 4: Merge and deduplicate results
-        merged_results = self._merge_and_deduplicate(all_results)
-        logger.debug(f"{self.name}: Merged {len(all_results)} results into {len(merged_results)} unique chunks")
+        # Step 3: Query ChromaDB for all queries in a single batched call
+        try:
+            query_results = self._query_many(target_repo_url, expanded_queries, query_embeddings)
+        except ValueError as e:
+            logger.warning(f"{self.name}: Collection not found for {target_repo_url}: {e}")
+            return []
+        except Exception as e:
+            logger.warning(f"{self.name}: Vector store query failed: {e}. Continuing without context.")
+            return []
         
-        # Step 5: Rank by relevance
-        ranked_results = self._rank_by_relevance(merged_results)
+        # A single surviving query is already ranked by the vector store - nothing to merge
+        if len(expanded_queries) == 1:
+            formatted = self._format_results(query_results[0])[:top_k]
+            for result in formatted:
+                result['query_index'] = 0
+                result['query'] = expanded_queries[0]
+            logger.info(f"{self.name}: Retrieved {len(formatted)} relevant chunks (single query)")
+            return formatted
         
-        # Step 6: Return top-K chunks
-        top_k_results = ranked_results[:self.settings.rag_top_k]
+        # Step 4: Merge and deduplicate results as they come in, keeping only
+        # the most relevant copy of each chunk
+        seen: Dict[bytes, Dict[str, Any]] = {}
+        total_results = 0
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for i, (query, results) in enumerate(zip(expanded_queries, query_results)):
+            formatted = self._format_results(results)
+            total_results += len(formatted)
+            # Tag results with query info
+            for result in formatted:
+                result['query_index'] = i
+                result['query'] = query
+                self._keep_most_relevant(seen, result)
+            if debug:
+                logger.debug(f"{self.name}: Query {i+1} returned {len(formatted)} results")
+        
+        logger.debug(f"{self.name}: Merged {total_results} results into {len(seen)} unique chunks")
+        
+        # Step 5: Rank by relevance and keep the top-K chunks
+        top_k_results = self._rank_by_relevance(seen.values(), top_k)
         logger.info(f"{self.name}: Retrieved {len(top_k_results)} relevant chunks (query expansion)")
         
         return top_k_results
     
+    def _embed_cached(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed query texts, reusing cached embeddings.
+        
+        Looks in the in-memory cache first, then the persistent embedding
+        cache if configured. Texts that miss both are embedded together in
+        one embed_batch() call.
+        
+        Args:
+            texts: Query texts to embed
+        
+        Returns:
+            List of embedding vectors (same order as input texts)
+        """
+        keys = [_text_key(text) for text in texts]
+        embeddings = [self._embedding_cache.get(key) for key in keys]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        disk_keys = {}
+        if missing and self.embedding_cache is not None:
+            model_name = getattr(self.embedding_service, 'model_name', '')
+            disk_keys = {i: EmbeddingCache.make_key(model_name, texts[i]) for i in missing}
+            stored = self.embedding_cache.get_many(list(disk_keys.values()))
+            for i in missing:
+                embedding = stored.get(disk_keys[i])
+                if embedding is not None:
+                    embeddings[i] = embedding
+                    self._embedding_cache.put(keys[i], embedding)
+            missing = [i for i in missing if embeddings[i] is None]
+        
+        if missing:
+            fresh = self.embedding_service.embed_batch([texts[i] for i in missing])
+            for i, embedding in zip(missing, fresh):
+                embeddings[i] = embedding
+                self._embedding_cache.put(keys[i], embedding)
+            if self.embedding_cache is not None:
+                self.embedding_cache.put_many(
+                    model_name,
+                    {disk_keys[i]: embeddings[i] for i in missing}
+                )
+        
+        logger.debug(f"{self.name}: Embedding cache hits: {len(texts) - len(missing)}/{len(texts)}")
+        
+        return embeddings
+    
+    def _drop_similar_queries(
+        self,
+        queries: List[str],
+        embeddings: List[List[float]]
+    ) -> Tuple[List[str], List[List[float]]]:
+        """
+        Drop queries whose embedding is nearly identical to an earlier query's.
+        
+        Uses cosine similarity against rag_query_similarity_threshold. The
+        first query of each near-duplicate group is kept, preserving order.
+        
+        Args:
+            queries: Query texts
+            embeddings: Query embeddings (same order as queries)
+        
+        Returns:
+            Tuple of (kept queries, kept embeddings)
+        """
+        threshold = self.settings.rag_query_similarity_threshold
+        
+        kept_queries = []
+        kept_embeddings = []
+        kept_unit = []
+        for query, embedding in zip(queries, embeddings):
+            norm = math.sqrt(sum(map(operator.mul, embedding, embedding))) or 1.0
+            unit = [value / norm for value in embedding]
+            if any(sum(map(operator.mul, unit, other)) >= threshold for other in kept_unit):
+                logger.debug(f"{self.name}: Dropping near-duplicate query: {query}")
+                continue
+            kept_queries.append(query)
+            kept_embeddings.append(embedding)
+            kept_unit.append(unit)
+        
+        if len(kept_queries) < len(queries):
+            logger.info(f"{self.name}: Dropped {len(queries) - len(kept_queries)} near-duplicate queries")
+        
+        return kept_queries, kept_embeddings
+    
+    def _query_many(
+        self,
+        repo_url: str,
+        query_texts: List[str],
+        query_embeddings: List[List[float]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the vector store for several queries, reusing recent results.
+        
+        Queries that miss the results cache are sent together in one
+        query_batch() call; ChromaDB's per-query lists are split back into
+        one result set per query.
+        
+        Args:
+            repo_url: Repository URL to query
+            query_texts: Texts the embeddings were generated from (used as cache keys)
+            query_embeddings: Query vector embeddings (same order as query_texts)
+        
+        Returns:
+            Raw ChromaDB results dictionary per query (same order as query_texts)
+        
+        Raises:
+            ValueError: If repository collection doesn't exist
+        """
+        top_k = self.settings.rag_top_k
+        keys = [(repo_url, _text_key(text), top_k) for text in query_texts]
+        results = [self._results_cache.get(key) for key in keys]
+        
+        missing = [i for i, query_results in enumerate(results) if query_results is None]
+        if missing:
+            batch = self.vector_store.query_batch(
+                repo_url=repo_url,
+                query_embeddings=[query_embeddings[i] for i in missing],
+                top_k=top_k
+            )
+            for position, i in enumerate(missing):
+                query_results = {
+                    key: [batch[key][position]]
+                    for key in ('documents', 'metadatas', 'distances')
+                    if batch.get(key)
+                }
+                results[i] = query_results
+                self._results_cache.put(keys[i], query_results)
+        
+        return results
+    
     def _generate_expanded_queries(self, parsed_brd: ParsedBRD) -> List[str]:
         """
         Generate targeted queries from BRD using LLM with comprehensive BRD analysis.
@@ -261,6 +568,13 @@ Generate exactly {target_query_count} queries, one per line. Format: one query p
 
 Queries:"""
 
+        # The prompt embeds the BRD context and target count, so it identifies the request
+        cache_key = (getattr(self.llm, 'model', ''), _text_key(prompt))
+        cached_queries = self._query_cache.get(cache_key)
+        if cached_queries is not None:
+            logger.info(f"{self.name}: Reusing {len(cached_queries)} cached expanded queries")
+            return list(cached_queries)
+        
         try:
             response = self.llm.generate(
                 prompt=prompt,
@@ -273,17 +587,6 @@ Queries:"""
             lines = response.strip().split('\n')
             queries = []
             
-            # Skip preamble lines (common LLM patterns)
-            skip_patterns = [
-                r'^here are',
-                r'^based on',
-                r'^the following',
-                r'^these queries',
-                r'^queries:',
-                r'^query:',
-                r'^the queries',
-            ]
-            
             for line in lines:
                 line = line.strip()
                 if not line:
@@ -294,15 +597,14 @@ Queries:"""
                     continue
                 
                 # Skip preamble lines
-                line_lower = line.lower()
-                if any(re.match(pattern, line_lower) for pattern in skip_patterns):
+                if _SKIP_RE.match(line):
                     continue
                 
                 # Remove numbering (e.g., "1. ", "1) ", "- ")
-                line = re.sub(r'^\d+[\.\)]\s*', '', line)  # Remove "1. " or "1) "
-                line = re.sub(r'^[-•]\s*', '', line)  # Remove "- " or "• "
+                line = _NUMBERING_RE.sub('', line)  # Remove "1. " or "1) "
+                line = _BULLET_RE.sub('', line)  # Remove "- " or "• "
                 # Remove quotes (both wrapping and internal)
-                line = re.sub(r'["\']', '', line)  # Remove all quotes
+                line = line.translate(_QUOTE_TRANS)  # Remove all quotes
                 line = line.strip()
                 
                 # Extract query from lines that might have explanatory text
@@ -310,23 +612,32 @@ Queries:"""
                 # If line is too long (>100 chars), try to extract the core query
                 if len(line) > 100:
                     # Try to extract query from patterns like "Search for X to find Y"
-                    match = re.search(r'(?:search for|investigate|locate|explore|analyze|identify)\s+([^.]{5,80})', line_lower)
+                    match = _EXTRACT_RE.search(line)
                     if match:
                         line = match.group(1).strip()
                     else:
                         # Take first part before common separators
-                        parts = re.split(r'[.,;]', line)
+                        parts = _SEPARATOR_RE.split(line)
                         if parts:
                             line = parts[0].strip()
                 
-                # Clean up common prefixes
-                line = re.sub(r'^(search for|investigate|locate|explore|analyze|identify|find)\s+', '', line_lower)
+                # Clean up common prefixes (case-insensitive; the query keeps its casing)
+                line = _PREFIX_RE.sub('', line)
                 line = line.strip()
                 
                 # Validate query (5-80 chars, not just numbers/punctuation)
-                if line and 5 <= len(line) <= 80 and re.search(r'[a-zA-Z]', line):
+                if line and 5 <= len(line) <= 80 and _LETTER_RE.search(line):
                     queries.append(line)
             
+            # Drop lexical duplicates (case, whitespace, trailing punctuation) before
+            # they take up slots in the embedding batch and vector store fan-out
+            raw_count = len(queries)
+            unique = {}
+            for query in queries:
+                unique.setdefault(_WHITESPACE_RE.sub(' ', query).strip(' .,;:!?').lower(), query)
+            queries = list(unique.values())
+            logger.debug(f"{self.name}: Parsed {raw_count} queries, {len(queries)} unique")
+            
             # Limit to target query count
             queries = queries[:target_query_count]
             
@@ -342,67 +653,54 @@ Queries:"""
             )
             logger.debug(f"{self.name}: Generated queries: {queries}")
             
+            self._query_cache.put(cache_key, tuple(queries))
             return queries
             
         except Exception as e:
             logger.error(f"{self.name}: Failed to generate expanded queries: {e}")
             raise
     
-    def _merge_and_deduplicate(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _keep_most_relevant(seen: Dict[bytes, Dict[str, Any]], result: Dict[str, Any]) -> None:
         """
-        Merge and deduplicate results from multiple queries.
-        
-        Deduplicates by content hash. If same content appears multiple times,
-        keeps the one with the lowest distance (most relevant).
+        Record a result in a content-hash map, keeping the lowest-distance copy.
         
         Args:
-            results: List of result chunks from multiple queries
-        
-        Returns:
-            Deduplicated list of chunks
+            seen: Map of content hash -> best result so far (updated in place)
+            result: Result chunk to merge in
         """
-        seen = {}  # content_hash -> best_result
-        
-        for result in results:
-            # Create hash of content for deduplication
-            content_hash = hashlib.md5(result['content'].encode()).hexdigest()
-            
-            if content_hash not in seen:
+        # Hash of content for deduplication (BLAKE2b digest bytes, no hex encoding).
+        # Kept only as the map key, so the returned chunks stay JSON-serializable.
+        content_hash = _text_key(result['content'])
+        
+        existing = seen.get(content_hash)
+        if existing is None:
+            seen[content_hash] = result
+        elif result['distance'] is not None and existing['distance'] is not None:
+            # Keep the one with lower distance (more relevant)
+            if result['distance'] < existing['distance']:
                 seen[content_hash] = result
-            else:
-                # Keep the one with lower distance (more relevant)
-                existing = seen[content_hash]
-                if result['distance'] is not None and existing['distance'] is not None:
-                    if result['distance'] < existing['distance']:
-                        seen[content_hash] = result
-                elif result['distance'] is not None:
-                    # Current has distance, existing doesn't - prefer current
-                    seen[content_hash] = result
-        
-        return list(seen.values())
+        elif result['distance'] is not None:
+            # Current has distance, existing doesn't - prefer current
+            seen[content_hash] = result
     
-    def _rank_by_relevance(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _rank_by_relevance(self, results: Iterable[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
         """
-        Rank results by relevance (distance score).
+        Rank results by relevance (distance score) and keep the top K.
         
         Lower distance = more relevant, so sort ascending.
         Results without distance go to the end.
         
         Args:
-            results: List of result chunks
+            results: Result chunks (any iterable)
+            top_k: Number of results to keep
         
         Returns:
-            Ranked list (most relevant first)
+            Ranked list of at most top_k results (most relevant first)
         """
-        # Separate results with and without distance
-        with_distance = [r for r in results if r.get('distance') is not None]
-        without_distance = [r for r in results if r.get('distance') is None]
-        
-        # Sort by distance (ascending - lower is better)
-        with_distance.sort(key=lambda x: x['distance'])
-        
-        # Combine: with distance first, then without
-        return with_distance + without_distance
+        # Partial heap selection, O(n log k); stable like sorted(...)[:top_k], so
+        # results without a distance keep their original order at the end
+        return heapq.nsmallest(top_k, results, key=_relevance_key)
     
     def _extract_brd_summary(self, parsed_brd: ParsedBRD) -> str:
         """
@@ -425,9 +723,7 @@ Queries:"""
         
         # Add business objectives
         if parsed_brd.business_objectives:
-            objectives_text = ", ".join([
-                obj.objective for obj in parsed_brd.business_objectives
-            ])
+            objectives_text = ", ".join(obj.objective for obj in parsed_brd.business_objectives)
             parts.append(f"Business Objectives: {objectives_text}")
         
         # Add project name/description
@@ -436,9 +732,9 @@ Queries:"""
         
         # Add functional requirements summary
         if parsed_brd.requirements and parsed_brd.requirements.functional:
-            req_summary = ", ".join([
+            req_summary = ", ".join(
                 req.description[:100] for req in parsed_brd.requirements.functional[:5]
-            ])
+            )
             if req_summary:
                 parts.append(f"Key Requirements: {req_summary}")
         
@@ -461,6 +757,10 @@ Queries:"""
         - All functional requirements (with descriptions and priorities)
         - Optional: non-functional requirements, project scope
         
+        Large BRDs are kept within budget: each section keeps its
+        _QUERY_CONTEXT_MAX_ITEMS highest-priority items, descriptions are
+        clipped, and the whole context is capped at rag_query_context_max_chars.
+        
         Args:
             parsed_brd: Parsed BRD object
         
@@ -478,49 +778,55 @@ Queries:"""
         # Business Objectives
         if parsed_brd.business_objectives:
             parts.append("BUSINESS OBJECTIVES:")
-            for i, obj in enumerate(parsed_brd.business_objectives, 1):
-                obj_text = f"  {obj.id}: {obj.objective}"
-                if obj.priority:
-                    obj_text += f" (Priority: {obj.priority})"
-                if obj.metric_success_criteria:
-                    obj_text += f"\n    Success Criteria: {obj.metric_success_criteria}"
-                parts.append(obj_text)
+            parts.extend(
+                f"  {obj.id}: {_clip(obj.objective)}"
+                + (f" (Priority: {obj.priority})" if obj.priority else "")
+                + (f"\n    Success Criteria: {_clip(obj.metric_success_criteria)}" if obj.metric_success_criteria else "")
+                for obj in _top_priority(parsed_brd.business_objectives)
+            )
             parts.append("")
         
         # Functional Requirements
         if parsed_brd.requirements and parsed_brd.requirements.functional:
             parts.append("FUNCTIONAL REQUIREMENTS:")
-            for req in parsed_brd.requirements.functional:
-                req_text = f"  {req.id}: {req.description}"
-                if req.priority:
-                    req_text += f" (Priority: {req.priority})"
-                parts.append(req_text)
+            parts.extend(
+                f"  {req.id}: {_clip(req.description)}" + (f" (Priority: {req.priority})" if req.priority else "")
+                for req in _top_priority(parsed_brd.requirements.functional)
+            )
             parts.append("")
         
         # Non-functional Requirements (optional)
         if parsed_brd.requirements and parsed_brd.requirements.non_functional:
             parts.append("NON-FUNCTIONAL REQUIREMENTS:")
-            for nfr in parsed_brd.requirements.non_functional:
-                nfr_text = f"  {nfr.id}: {nfr.description}"
-                if nfr.priority:
-                    nfr_text += f" (Priority: {nfr.priority})"
-                parts.append(nfr_text)
+            parts.extend(
+                f"  {nfr.id}: {_clip(nfr.description)}" + (f" (Priority: {nfr.priority})" if nfr.priority else "")
+                for nfr in _top_priority(parsed_brd.requirements.non_functional)
+            )
             parts.append("")
         
         # Project Scope (optional)
         if parsed_brd.project_scope:
             if parsed_brd.project_scope.in_scope:
                 parts.append("IN SCOPE:")
-                for item in parsed_brd.project_scope.in_scope:
-                    parts.append(f"  - {item}")
+                parts.extend(
+                    f"  - {_clip(item)}" for item in parsed_brd.project_scope.in_scope[:_QUERY_CONTEXT_MAX_ITEMS]
+                )
                 parts.append("")
         
-        return "\n".join(parts)
+        context = "\n".join(parts)
+        max_chars = self.settings.rag_query_context_max_chars
+        if len(context) > max_chars:
+            context = context[:max_chars] + "\n... [truncated]"
+        
+        return context
     
     def _format_results(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Format ChromaDB query results into a clean list of chunks.
         
+        Chunk content is stripped and truncated to _MAX_CHUNK_CHARS here, once,
+        so it arrives at the planner ready to be placed in the prompt.
+        
         Args:
             results: Raw ChromaDB query results dictionary
         
@@ -533,16 +839,24 @@ Queries:"""
         if not results or 'documents' not in results:
             return formatted
         
-        documents = results.get('documents', [[]])[0] if results.get('documents') else []
-        metadatas = results.get('metadatas', [[]])[0] if results.get('metadatas') else []
-        distances = results.get('distances', [[]])[0] if results.get('distances') else []
+        def first(key: str) -> list:
+            return (results.get(key) or [[]])[0] or []
+        
+        # Pad metadatas/distances so a short list never truncates the documents
+        rows = zip(
+            first('documents'),
+            chain(first('metadatas'), repeat(None)),
+            chain(first('distances'), repeat(None)),
+        )
         
-        for i, doc_content in enumerate(documents):
-            metadata = metadatas[i] if i < len(metadatas) else {}
-            distance = distances[i] if i < len(distances) else None
+        for doc_content, metadata, distance in rows:
+            metadata = metadata or {}
+            content = (doc_content or '').strip()
+            if len(content) > _MAX_CHUNK_CHARS:
+                content = content[:_MAX_CHUNK_CHARS] + "..."
             
             formatted.append({
-                'content': doc_content,
+                'content': content,
                 'source': metadata.get('file_path', 'unknown'),
                 'metadata': metadata,
                 'distance': distance,
@@ -4,19 +4,135 @@ Generates Project Schedules from Engineering Plans
 (Prompts migrated from n8n project_schedule_generator.json)
 """
 
-import json
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import orjson
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from .base import BaseAgent
-from ..models.plan import EngineeringPlan
+from ..models.plan import EngineeringPlan, FeatureBreakdown, ImplementationPhase, Risk
 from ..models.schedule import ProjectSchedule, ProjectScheduleContent
+from ..services.json_stream import StreamingArrayParser
+from ..services.llm import cached_text_block, strip_code_fence, text_block
+from ..services.schedule_cache import SemanticScheduleCache
+from ..config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
 
+# === Prompt scaffolding (static; byte-identical across calls so it hits the prompt cache) ===
+
+# Gantt progress percentage by task status (anything else counts as not started)
+_PROGRESS_BY_STATUS = {"Completed": 100, "In Progress": 50}
+
+# Serializers for the plan sections sent to the LLM (model -> JSON, no intermediate dicts)
+_FEATURES_JSON = TypeAdapter(List[FeatureBreakdown])
+_PHASES_JSON = TypeAdapter(List[ImplementationPhase])
+_RISKS_JSON = TypeAdapter(List[Risk])
+
+
+class _ScheduleResponse(BaseModel):
+    """Top level of a well-formed schedule response, validated straight from JSON text."""
+    project_schedule: ProjectScheduleContent
+
+
+_SCHEDULE_INSTRUCTIONS = """You are an expert Project Manager and Engineering Leader specializing in software project scheduling and resource planning.
+
+Based on the Engineering Plan provided in the user message, create a detailed Project Schedule. The project start date is given with the plan.
+
+Generate a comprehensive Project Schedule in JSON format with this structure:
+
+{
+  "project_schedule": {
+    "project_info": {
+      "project_name": "string",
+      "start_date": "YYYY-MM-DD",
+      "estimated_end_date": "YYYY-MM-DD",
+      "total_duration_weeks": "number",
+      "total_effort_person_weeks": "number"
+    },
+    "phases": [
+      {
+        "phase_id": "string",
+        "phase_name": "string",
+        "start_date": "YYYY-MM-DD",
+        "end_date": "YYYY-MM-DD",
+        "duration_weeks": "number",
+        "milestones": [
+          {
+            "milestone_id": "string",
+            "name": "string",
+            "target_date": "YYYY-MM-DD",
+            "deliverables": ["string"],
+            "dependencies": ["string"]
+          }
+        ],
+        "tasks": [
+          {
+            "task_id": "string",
+            "task_name": "string",
+            "description": "string",
+            "assigned_to": "string (role)",
+            "start_date": "YYYY-MM-DD",
+            "end_date": "YYYY-MM-DD",
+            "effort_days": "number",
+            "status": "Not Started|In Progress|Completed",
+            "dependencies": ["string"],
+            "priority": "Critical|High|Medium|Low"
+          }
+        ]
+      }
+    ],
+    "resource_allocation": [
+      {
+        "role": "string",
+        "allocation_percentage": "number",
+        "start_date": "YYYY-MM-DD",
+        "end_date": "YYYY-MM-DD",
+        "key_responsibilities": ["string"]
+      }
+    ],
+    "critical_path": [
+      {
+        "task_id": "string",
+        "task_name": "string",
+        "duration_days": "number",
+        "slack_days": "number"
+      }
+    ],
+    "risk_timeline": [
+      {
+        "risk_id": "string",
+        "description": "string",
+        "impact_on_schedule": "string",
+        "contingency_buffer_days": "number"
+      }
+    ],
+    "key_deliverables": [
+      {
+        "deliverable_name": "string",
+        "due_date": "YYYY-MM-DD",
+        "responsible_team": "string",
+        "dependencies": ["string"]
+      }
+    ],
+    "assumptions": ["string"],
+    "constraints": ["string"]
+  }
+}
+
+IMPORTANT: 
+- Return ONLY valid JSON, no markdown formatting, no explanation text. Start with { and end with }.
+- Use the given project start date as the start_date for the project.
+- Calculate all other dates relative to the project start date.
+- Be realistic with timelines, account for dependencies, and include buffer time for risks.
+- Provide specific dates in YYYY-MM-DD format and detailed task breakdowns."""
+
+
 class SchedulerAgent(BaseAgent):
     """
     Scheduler Agent - Generates Project Schedules from Engineering Plans.
@@ -30,23 +146,201 @@ class SchedulerAgent(BaseAgent):
     name = "SchedulerAgent"
     description = "Generates Project Schedules from Engineering Plans"
     
+    def __init__(
+        self,
+        llm_service=None,
+        schedule_cache: Optional[SemanticScheduleCache] = None,
+        **kwargs
+    ):
+        """
+        Initialize SchedulerAgent.
+        
+        Args:
+            llm_service: LLM service used to generate schedules
+            schedule_cache: Optional semantic schedule cache. If None, one is created
+                            when schedule_cache_enabled is set in config.
+            **kwargs: Additional arguments passed to BaseAgent
+        """
+        super().__init__(llm_service=llm_service, **kwargs)
+        
+        if schedule_cache is None and get_settings().schedule_cache_enabled:
+            schedule_cache = SemanticScheduleCache()
+        self.schedule_cache = schedule_cache
+        
+        # The instructions never change for an agent, so build the system prompt once
+        self._system_prompt = [cached_text_block(_SCHEDULE_INSTRUCTIONS)]
+        
+        # Reported in every result's metadata; the LLM service doesn't change after init
+        self._llm_model_name = getattr(self.llm, 'model', 'claude-3-haiku-20240307')
+    
     def run(
         self,
         engineering_plan: EngineeringPlan,
         start_date: Optional[str] = None,
-        include_metadata: bool = True
+        include_metadata: bool = True,
+        on_phase: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> ProjectSchedule:
         """
         Generate a Project Schedule from an Engineering Plan.
         
+        The response is streamed from the LLM. If on_phase is given, it is
+        called with each phase (as a raw dict, tasks and milestones included)
+        as soon as that phase has been generated, before the full schedule
+        is validated.
+        
         Args:
             engineering_plan: Engineering plan to schedule
             start_date: Project start date (YYYY-MM-DD), defaults to today
             include_metadata: Whether to include generation metadata
+            on_phase: Optional callback for phases as they are generated
+            
+        Returns:
+            ProjectSchedule with phases, tasks, and timeline
+        """
+        # One clock read per run, shared by every timestamp this run produces
+        generated_at = datetime.now(timezone.utc).isoformat()
+        project_name, start_date, schedule_input = self._prepare_input(engineering_plan, start_date)
+        
+        schedule_data, fingerprint = self._lookup_cached(schedule_input, start_date)
+        if schedule_data is not None:
+            if on_phase is not None:
+                for phase in schedule_data.phases:
+                    on_phase(phase.model_dump())
+        else:
+            # Build the prompt from the n8n workflow (static instructions as a cached system prompt)
+            system_prompt, content_blocks = self._build_prompt(schedule_input, start_date)
             
+            # Call LLM (matches n8n: claude-3-haiku, temp=0.7, max_tokens=4000)
+            phase_parser = StreamingArrayParser("phases") if on_phase is not None else None
+            chunks = []
+            for chunk in self.llm.stream(
+                prompt=content_blocks,
+                system_prompt=system_prompt,
+                max_tokens=4000,
+                temperature=0.7
+            ):
+                chunks.append(chunk)
+                if phase_parser is not None:
+                    for phase in phase_parser.feed(chunk):
+                        on_phase(phase)
+            schedule_data = self._parse_and_store("".join(chunks), fingerprint, start_date, generated_at)
+        
+        return self._assemble(schedule_data, project_name, start_date, generated_at, include_metadata)
+    
+    async def run_async(
+        self,
+        engineering_plan: EngineeringPlan,
+        start_date: Optional[str] = None,
+        include_metadata: bool = True
+    ) -> ProjectSchedule:
+        """
+        Awaitable version of run() for async callers.
+        
+        The LLM call is awaited via generate_async(), so callers can
+        asyncio.gather() several schedules and overlap their generation.
+        Schedule cache lookups and writes run in a worker thread.
+        
+        Args:
+            engineering_plan: Engineering plan to schedule
+            start_date: Project start date (YYYY-MM-DD), defaults to today
+            include_metadata: Whether to include generation metadata
+        
         Returns:
             ProjectSchedule with phases, tasks, and timeline
         """
+        generated_at = datetime.now(timezone.utc).isoformat()
+        project_name, start_date, schedule_input = self._prepare_input(engineering_plan, start_date)
+        
+        schedule_data, fingerprint = await asyncio.to_thread(self._lookup_cached, schedule_input, start_date)
+        if schedule_data is None:
+            system_prompt, content_blocks = self._build_prompt(schedule_input, start_date)
+            response_text = await self.llm.generate_async(
+                prompt=content_blocks,
+                system_prompt=system_prompt,
+                max_tokens=4000,
+                temperature=0.7
+            )
+            schedule_data = await asyncio.to_thread(
+                self._parse_and_store, response_text, fingerprint, start_date, generated_at
+            )
+        
+        return self._assemble(schedule_data, project_name, start_date, generated_at, include_metadata)
+    
+    def run_batch(
+        self,
+        engineering_plans: List[EngineeringPlan],
+        start_date: Optional[str] = None,
+        include_metadata: bool = True
+    ) -> List[ProjectSchedule]:
+        """
+        Generate Project Schedules for several Engineering Plans.
+        
+        Blocking wrapper around run_batch_async(); must not be called from
+        a running event loop (await run_batch_async() there instead). Each
+        call runs its own event loop and closes the LLM's async client for
+        that loop before returning.
+        
+        Args:
+            engineering_plans: Engineering plans to schedule
+            start_date: Project start date (YYYY-MM-DD) for every plan, defaults to today
+            include_metadata: Whether to include generation metadata
+        
+        Returns:
+            One ProjectSchedule per plan, in input order
+        """
+        async def run_and_close() -> List[ProjectSchedule]:
+            try:
+                return await self.run_batch_async(engineering_plans, start_date, include_metadata)
+            finally:
+                await self.llm.aclose()
+        
+        return asyncio.run(run_and_close())
+    
+    async def run_batch_async(
+        self,
+        engineering_plans: List[EngineeringPlan],
+        start_date: Optional[str] = None,
+        include_metadata: bool = True
+    ) -> List[ProjectSchedule]:
+        """
+        Generate Project Schedules for several Engineering Plans concurrently.
+        
+        Every request shares the same cached system prompt. The first plan
+        is scheduled on its own so its request writes that prefix to the
+        prompt cache; the rest then run concurrently via run_async() and
+        read it instead of each paying for a cache write.
+        
+        Args:
+            engineering_plans: Engineering plans to schedule
+            start_date: Project start date (YYYY-MM-DD) for every plan, defaults to today
+            include_metadata: Whether to include generation metadata
+        
+        Returns:
+            One ProjectSchedule per plan, in input order
+        """
+        if not engineering_plans:
+            return []
+        
+        logger.info(f"{self.name}: Scheduling batch of {len(engineering_plans)} plans")
+        
+        first = await self.run_async(engineering_plans[0], start_date, include_metadata)
+        rest = await asyncio.gather(*(
+            self.run_async(plan, start_date, include_metadata)
+            for plan in engineering_plans[1:]
+        ))
+        return [first, *rest]
+    
+    def _prepare_input(
+        self,
+        engineering_plan: EngineeringPlan,
+        start_date: Optional[str]
+    ) -> Tuple[str, str, dict]:
+        """
+        Extract scheduling information (matches n8n Parse Engineering Plan node).
+        
+        Returns:
+            Tuple of (project name, start date, schedule input dict)
+        """
         plan = engineering_plan.engineering_plan
         project_name = plan.project_overview.name
         
@@ -54,49 +348,107 @@ class SchedulerAgent(BaseAgent):
         
         # Use today's date as default (matches n8n behavior)
         if not start_date:
-            start_date = datetime.now().strftime("%Y-%m-%d")
+            start_date = date.today().isoformat()
         
-        # Extract scheduling information (matches n8n Parse Engineering Plan node)
+        # Sections go straight from the models to the JSON embedded in the prompt;
+        # only the fields the schedule cache fingerprints are pulled out as values
         schedule_input = {
-            "project_name": plan.project_overview.name or "Unnamed Project",
-            "features": [f.model_dump() for f in plan.feature_breakdown],
-            "phases": [p.model_dump() for p in plan.implementation_phases],
-            "risks": [r.model_dump() for r in plan.risk_analysis],
-            "resources": plan.resource_requirements.model_dump(),
+            "project_name": project_name or "Unnamed Project",
+            "features_json": _FEATURES_JSON.dump_json(plan.feature_breakdown).decode(),
+            "phases_json": _PHASES_JSON.dump_json(plan.implementation_phases).decode(),
+            "risks_json": _RISKS_JSON.dump_json(plan.risk_analysis).decode(),
+            "resources_json": plan.resource_requirements.model_dump_json(),
+            "phase_names": [phase.phase_name for phase in plan.implementation_phases],
+            "team_composition": plan.resource_requirements.team_composition,
             "total_features": len(plan.feature_breakdown),
             "total_phases": len(plan.implementation_phases),
         }
         
-        # Build the exact prompt from n8n workflow
-        prompt = self._build_prompt(schedule_input, start_date)
+        return project_name, start_date, schedule_input
+    
+    def _lookup_cached(
+        self,
+        schedule_input: dict,
+        start_date: str
+    ) -> Tuple[Optional[ProjectScheduleContent], Optional[str]]:
+        """
+        Look for a schedule generated for a structurally similar plan, re-dated to start_date.
         
-        # Call LLM (matches n8n: claude-3-haiku, temp=0.7, max_tokens=4000)
-        response_text = self.llm.generate(
-            prompt=prompt,
-            max_tokens=4000,
-            temperature=0.7
-        )
+        Returns:
+            Tuple of (cached schedule or None, plan fingerprint or None if caching is off)
+        """
+        if self.schedule_cache is None:
+            return None, None
         
-        # Parse the response
-        schedule_data = self._parse_response(response_text)
+        fingerprint = SemanticScheduleCache.fingerprint(schedule_input)
+        try:
+            cached = self.schedule_cache.get(fingerprint, schedule_input["project_name"], start_date)
+            if cached is None:
+                return None, fingerprint
+            # Cached schedules were validated before being stored
+            return ProjectScheduleContent.from_trusted_dict(cached["project_schedule"]), fingerprint
+        except Exception as e:
+            logger.warning(f"{self.name}: Schedule cache lookup failed: {e}")
+            return None, fingerprint
+    
+    def _parse_and_store(
+        self,
+        response_text: str,
+        fingerprint: Optional[str],
+        start_date: str,
+        generated_at: str
+    ) -> Union[dict, ProjectScheduleContent]:
+        """
+        Parse the LLM response and cache the schedule if it parsed cleanly.
         
-        # Build the ProjectSchedule
-        content = ProjectScheduleContent.model_validate(
-            schedule_data.get("project_schedule", schedule_data)
-        )
+        A well-formed response is validated straight from the JSON text into
+        ProjectScheduleContent, skipping the intermediate dict.
+        """
+        try:
+            content = _ScheduleResponse.model_validate_json(
+                strip_code_fence(response_text)
+            ).project_schedule
+        except ValidationError:
+            # Unwrapped or malformed - the dict path handles it as before
+            schedule_data = self._parse_response(response_text, generated_at=generated_at)
+            if "parsing_error" in schedule_data.get("project_schedule", {}):
+                return schedule_data
+            content = ProjectScheduleContent.model_validate(schedule_data.get("project_schedule", schedule_data))
+        
+        if fingerprint is not None:
+            # Cache the validated dump, so hits can be rebuilt without validation
+            try:
+                self.schedule_cache.put(fingerprint, start_date, {"project_schedule": content.model_dump()})
+            except Exception as e:
+                logger.warning(f"{self.name}: Failed to cache schedule: {e}")
         
-        # Calculate summary stats (matches n8n)
-        summary = self._calculate_summary(content)
+        return content
+    
+    def _assemble(
+        self,
+        schedule_data: Union[dict, ProjectScheduleContent],
+        project_name: str,
+        start_date: str,
+        generated_at: str,
+        include_metadata: bool
+    ) -> ProjectSchedule:
+        """Build the ProjectSchedule, summary and Gantt data from parsed schedule data."""
+        if isinstance(schedule_data, ProjectScheduleContent):
+            content = schedule_data
+        else:
+            content = ProjectScheduleContent.model_validate(
+                schedule_data.get("project_schedule", schedule_data)
+            )
         
-        # Generate Gantt chart data (matches n8n Generate Gantt Chart Data node)
-        gantt_data = self._generate_gantt_data(content)
+        # Calculate summary stats and Gantt chart data (matches n8n) in a single pass
+        summary, gantt_data = self._build_summary_and_gantt(content, generated_at)
         
         result = ProjectSchedule(
             success=True,
             project_schedule=content,
             summary=summary,
             visualization={"gantt_chart": gantt_data},
-            metadata=self._generate_metadata(project_name, start_date) if include_metadata else None
+            metadata=self._generate_metadata(project_name, start_date, generated_at) if include_metadata else None
         )
         
         logger.info(
@@ -108,129 +460,41 @@ class SchedulerAgent(BaseAgent):
         
         return result
     
-    def _build_prompt(self, data: dict, current_date: str) -> str:
+    def _build_prompt(self, data: dict, current_date: str) -> Tuple[List[dict], List[dict]]:
         """
-        Build the exact prompt from n8n project_schedule_generator.json
+        Build the prompt from n8n project_schedule_generator.json.
+        
+        The static instructions and JSON schema go in the cached system prompt;
+        only the plan details and start date are sent fresh on each call.
+        
+        Returns:
+            Tuple of (system prompt blocks, user message content blocks)
         """
-        return f"""You are an expert Project Manager and Engineering Leader specializing in software project scheduling and resource planning.
-
-Based on the following Engineering Plan, create a detailed Project Schedule:
+        request = f"""Based on the following Engineering Plan, create a detailed Project Schedule:
 
 Project: {data['project_name']}
 Total Features: {data['total_features']}
-Implementation Phases: {json.dumps(data['phases'])}
-Features Details: {json.dumps(data['features'])}
-Risks: {json.dumps(data['risks'])}
-Resource Requirements: {json.dumps(data['resources'])}
+Implementation Phases: {data['phases_json']}
+Features Details: {data['features_json']}
+Risks: {data['risks_json']}
+Resource Requirements: {data['resources_json']}
 
 **IMPORTANT: Use {current_date} as the project start date (today's date).**
-
-Generate a comprehensive Project Schedule in JSON format with this structure:
-
-{{
-  "project_schedule": {{
-    "project_info": {{
-      "project_name": "string",
-      "start_date": "YYYY-MM-DD",
-      "estimated_end_date": "YYYY-MM-DD",
-      "total_duration_weeks": "number",
-      "total_effort_person_weeks": "number"
-    }},
-    "phases": [
-      {{
-        "phase_id": "string",
-        "phase_name": "string",
-        "start_date": "YYYY-MM-DD",
-        "end_date": "YYYY-MM-DD",
-        "duration_weeks": "number",
-        "milestones": [
-          {{
-            "milestone_id": "string",
-            "name": "string",
-            "target_date": "YYYY-MM-DD",
-            "deliverables": ["string"],
-            "dependencies": ["string"]
-          }}
-        ],
-        "tasks": [
-          {{
-            "task_id": "string",
-            "task_name": "string",
-            "description": "string",
-            "assigned_to": "string (role)",
-            "start_date": "YYYY-MM-DD",
-            "end_date": "YYYY-MM-DD",
-            "effort_days": "number",
-            "status": "Not Started|In Progress|Completed",
-            "dependencies": ["string"],
-            "priority": "Critical|High|Medium|Low"
-          }}
-        ]
-      }}
-    ],
-    "resource_allocation": [
-      {{
-        "role": "string",
-        "allocation_percentage": "number",
-        "start_date": "YYYY-MM-DD",
-        "end_date": "YYYY-MM-DD",
-        "key_responsibilities": ["string"]
-      }}
-    ],
-    "critical_path": [
-      {{
-        "task_id": "string",
-        "task_name": "string",
-        "duration_days": "number",
-        "slack_days": "number"
-      }}
-    ],
-    "risk_timeline": [
-      {{
-        "risk_id": "string",
-        "description": "string",
-        "impact_on_schedule": "string",
-        "contingency_buffer_days": "number"
-      }}
-    ],
-    "key_deliverables": [
-      {{
-        "deliverable_name": "string",
-        "due_date": "YYYY-MM-DD",
-        "responsible_team": "string",
-        "dependencies": ["string"]
-      }}
-    ],
-    "assumptions": ["string"],
-    "constraints": ["string"]
-  }}
-}}
-
-IMPORTANT: 
-- Return ONLY valid JSON, no markdown formatting, no explanation text. Start with {{ and end with }}.
-- Use {current_date} as the start_date for the project.
-- Calculate all other dates relative to {current_date}.
-- Be realistic with timelines, account for dependencies, and include buffer time for risks.
-- Provide specific dates in YYYY-MM-DD format and detailed task breakdowns."""
+Calculate all other dates relative to {current_date}."""
+        return self._system_prompt, [text_block(request)]
     
-    def _parse_response(self, response_text: str) -> dict:
+    def _parse_response(self, response_text: str, generated_at: Optional[str] = None) -> dict:
         """
         Parse LLM response, cleaning up markdown if present (matches n8n logic).
-        """
-        ai_response = response_text.strip()
         
+        generated_at stamps the error structure; if omitted, the current time is used.
+        """
         # Clean up markdown formatting if present (from n8n)
-        if ai_response.startswith("```json"):
-            ai_response = ai_response[7:]
-        elif ai_response.startswith("```"):
-            ai_response = ai_response[3:]
-        if ai_response.endswith("```"):
-            ai_response = ai_response[:-3]
-        ai_response = ai_response.strip()
+        ai_response = strip_code_fence(response_text)
         
         try:
-            return json.loads(ai_response)
-        except json.JSONDecodeError as e:
+            return orjson.loads(ai_response)
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {e}")
             logger.debug(f"Raw response: {response_text[:500]}...")
             # Return error structure like n8n does
@@ -238,41 +502,34 @@ IMPORTANT:
                 "project_schedule": {
                     "raw_response": response_text,
                     "parsing_error": str(e),
-                    "generated_at": datetime.utcnow().isoformat(),
+                    "generated_at": generated_at or datetime.now(timezone.utc).isoformat(),
                     "note": "AI response could not be parsed as JSON"
                 }
             }
     
-    def _calculate_summary(self, content: ProjectScheduleContent) -> dict:
-        """Calculate summary statistics (matches n8n Format Schedule Output node)."""
-        total_tasks = sum(len(phase.tasks) for phase in content.phases)
-        total_milestones = sum(len(phase.milestones) for phase in content.phases)
-        
-        return {
-            "total_phases": len(content.phases),
-            "total_tasks": total_tasks,
-            "total_milestones": total_milestones,
-            "generated_at": datetime.utcnow().isoformat()
-        }
-    
-    def _generate_gantt_data(self, content: ProjectScheduleContent) -> dict:
+    def _build_summary_and_gantt(self, content: ProjectScheduleContent, generated_at: str) -> Tuple[dict, dict]:
         """
-        Generate Gantt chart data for visualization.
-        Matches n8n Generate Gantt Chart Data node exactly.
+        Calculate summary statistics and Gantt chart data in one pass over the phases.
+        
+        Summary matches n8n Format Schedule Output node; Gantt data matches
+        n8n Generate Gantt Chart Data node exactly.
+        
+        Returns:
+            Tuple of (summary dict, Gantt chart dict)
         """
-        gantt_data = {
-            "chart_type": "gantt",
-            "project_name": content.project_info.project_name,
-            "start_date": content.project_info.start_date,
-            "end_date": content.project_info.estimated_end_date,
-            "tasks": []
-        }
+        tasks = []
+        total_tasks = 0
+        total_milestones = 0
         
         # Convert phases and tasks to Gantt format (exact n8n logic)
         for phase_index, phase in enumerate(content.phases):
+            total_tasks += len(phase.tasks)
+            total_milestones += len(phase.milestones)
+            
+            parent_id = f"phase-{phase_index}"
             # Add phase as a group
-            gantt_data["tasks"].append({
-                "id": f"phase-{phase_index}",
+            tasks.append({
+                "id": parent_id,
                 "name": phase.phase_name,
                 "start": phase.start_date,
                 "end": phase.end_date,
@@ -283,37 +540,45 @@ IMPORTANT:
             
             # Add tasks under the phase
             for task_index, task in enumerate(phase.tasks):
-                progress = 0
-                if task.status == "Completed":
-                    progress = 100
-                elif task.status == "In Progress":
-                    progress = 50
-                
-                gantt_data["tasks"].append({
+                tasks.append({
                     "id": task.task_id or f"task-{phase_index}-{task_index}",
                     "name": task.task_name,
                     "start": task.start_date,
                     "end": task.end_date,
                     "type": "task",
-                    "progress": progress,
+                    "progress": _PROGRESS_BY_STATUS.get(task.status, 0),
                     "dependencies": task.dependencies,
                     "assigned_to": task.assigned_to,
                     "priority": task.priority,
-                    "parent": f"phase-{phase_index}"
+                    "parent": parent_id
                 })
         
-        gantt_data["generated_at"] = datetime.utcnow().isoformat()
+        summary = {
+            "total_phases": len(content.phases),
+            "total_tasks": total_tasks,
+            "total_milestones": total_milestones,
+            "generated_at": generated_at
+        }
+        
+        gantt_data = {
+            "chart_type": "gantt",
+            "project_name": content.project_info.project_name,
+            "start_date": content.project_info.start_date,
+            "end_date": content.project_info.estimated_end_date,
+            "tasks": tasks,
+            "generated_at": generated_at
+        }
         
-        return gantt_data
+        return summary, gantt_data
     
-    def _generate_metadata(self, project_name: str, start_date: str) -> dict:
+    def _generate_metadata(self, project_name: str, start_date: str, generated_at: str) -> dict:
         """Generate metadata for the project schedule (matches n8n structure)."""
         return {
             "generated_by": "Planning Agent - Project Schedule Generator",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": generated_at,
             "source_plan": project_name,
             "version": "1.0",
-            "ai_model": getattr(self.llm, 'model', 'claude-3-haiku-20240307'),
+            "ai_model": self._llm_model_name,
             "tokens_used": {
                 "input": 0,  # Would need to track from LLM response
                 "output": 0
@@ -4,10 +4,11 @@ Loads settings from environment variables with sensible defaults
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
 
@@ -33,6 +34,14 @@ class Settings(BaseSettings):
         default=0.7,
         description="Temperature for LLM generation (0.0-1.0)"
     )
+    llm_max_connections: int = Field(
+        default=100,
+        description="Maximum open connections in the shared Anthropic HTTP pool"
+    )
+    llm_max_keepalive_connections: int = Field(
+        default=20,
+        description="Idle connections kept alive in the shared Anthropic HTTP pool"
+    )
     
     # === API Configuration ===
     api_host: str = Field(
@@ -86,6 +95,84 @@ class Settings(BaseSettings):
         description="Maximum number of expanded queries for Query Expansion RAG (increased from 3 to better cover BRDs with multiple objectives and requirements. Actual count is dynamic based on BRD complexity)"
     )
     
+    rag_query_similarity_threshold: float = Field(
+        default=0.95,
+        description="Expanded queries whose embeddings have at least this cosine similarity to an earlier query are dropped as near-duplicates"
+    )
+    
+    rag_query_context_max_chars: int = Field(
+        default=4000,
+        description="Maximum length of the BRD context sent to the LLM when generating expanded queries; longer contexts are truncated"
+    )
+    
+    rag_distance_cutoff: Optional[float] = Field(
+        default=None,
+        description="Drop retrieved chunks with a distance above this before planning (disabled if unset; the scale depends on the collection's distance metric, L2 by default)"
+    )
+    
+    rag_cache_max_entries: int = Field(
+        default=256,
+        description="Maximum number of query embeddings and vector store results kept in memory by the retriever"
+    )
+    
+    rag_results_cache_ttl_seconds: int = Field(
+        default=300,
+        description="Lifetime of cached vector store results in seconds, so re-ingested repositories are picked up"
+    )
+    
+    rag_query_cache_ttl_seconds: int = Field(
+        default=604800,
+        description="Lifetime of cached LLM-generated expanded queries in seconds (default: 7 days)"
+    )
+    
+    # === Plan Cache ===
+    plan_cache_enabled: bool = Field(
+        default=False,
+        description="Enable/disable the persistent engineering plan cache (feature flag)"
+    )
+    
+    plan_cache_path: str = Field(
+        default="./.plan_cache/plan_cache.db",
+        description="Path to the SQLite database backing the plan cache"
+    )
+    
+    plan_cache_max_entries: int = Field(
+        default=128,
+        description="Maximum number of cached plans before least recently used entries are evicted"
+    )
+    
+    plan_cache_ttl_seconds: int = Field(
+        default=7 * 24 * 3600,
+        description="Lifetime of a cached plan in seconds (default: 7 days)"
+    )
+    
+    # === Schedule Cache ===
+    schedule_cache_enabled: bool = Field(
+        default=False,
+        description="Enable/disable reusing schedules generated for structurally similar plans (feature flag)"
+    )
+    
+    schedule_cache_max_distance: float = Field(
+        default=0.15,
+        description="Maximum cosine distance between plan fingerprints for a cached schedule to be reused"
+    )
+    
+    # === Embedding Cache ===
+    embedding_cache_enabled: bool = Field(
+        default=False,
+        description="Enable/disable the persistent query embedding cache (feature flag)"
+    )
+    
+    embedding_cache_path: str = Field(
+        default="./.embedding_cache/embeddings.db",
+        description="Path to the SQLite database backing the embedding cache"
+    )
+    
+    embedding_cache_max_entries: int = Field(
+        default=10000,
+        description="Maximum number of cached query embeddings before least recently used entries are evicted"
+    )
+    
     # === Paths ===
     @property
     def project_root(self) -> Path:
@@ -107,26 +194,22 @@ class Settings(BaseSettings):
         """Get the outputs directory"""
         return self.sample_inputs_dir / "outputs"
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False  # Allow ANTHROPIC_API_KEY or anthropic_api_key
-
-
-# Global settings instance
-# This will be loaded once when the module is imported
-_settings: Optional[Settings] = None
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,  # Allow ANTHROPIC_API_KEY or anthropic_api_key
+        extra="ignore",  # Unrelated keys in a shared .env are not errors
+    )
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Get the application settings.
-    Creates the settings instance on first call (lazy loading).
+    Creates the settings instance on first call (lazy loading); later calls
+    hit the lru_cache fast path.
     """
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-    return _settings
+    return Settings()
 
 
 def reload_settings() -> Settings:
@@ -134,7 +217,5 @@ def reload_settings() -> Settings:
     Reload settings from environment.
     Useful for testing or when env vars change.
     """
-    global _settings
-    _settings = Settings()
-    return _settings
-
+    get_settings.cache_clear()
+    return get_settings()
@@ -3,9 +3,13 @@ BRD Agent - LangGraph State
 Defines the state that flows through the agent pipeline
 """
 
-from typing import Any, Optional
+import operator
+from typing import Annotated, Any, Optional
 from typing_extensions import TypedDict
 
+from ..models.brd import ParsedBRD
+from ..models.plan import EngineeringPlan
+
 
 class AgentState(TypedDict, total=False):
     """
@@ -21,6 +25,7 @@ class AgentState(TypedDict, total=False):
     
     # === After Parser ===
     parsed_brd: dict  # Normalized BRD data
+    brd_model: ParsedBRD  # parsed_brd as a model, built once for the retriever and planner
     
     # === After Retriever (RAG) ===
     retrieved_context: Optional[list]  # Retrieved document chunks from RAG
@@ -28,13 +33,15 @@ class AgentState(TypedDict, total=False):
     
     # === After Planner ===
     engineering_plan: dict  # Generated engineering plan
+    engineering_plan_model: EngineeringPlan  # The same plan as a model, handed to the scheduler as is
     
     # === After Scheduler ===
     project_schedule: dict  # Generated project schedule
     
     # === Metadata ===
-    stages_completed: list[str]  # Track which stages completed
-    errors: list[str]  # Any errors encountered
+    # Nodes return only their new entries; the operator.add reducer appends them
+    stages_completed: Annotated[list[str], operator.add]  # Track which stages completed
+    errors: Annotated[list[str], operator.add]  # Any errors encountered
     
     # === Output ===
     status: str  # "success" or "error"
@@ -3,20 +3,41 @@ BRD Agent - LangGraph Workflow
 Defines the agent pipeline using LangGraph
 """
 
+import asyncio
 import logging
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import AsyncIterator, Iterator, List, Optional
 
+import orjson
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
+from pydantic import BaseModel
 
 from .state import AgentState
 from ..agents import ParserAgent, PlannerAgent, SchedulerAgent, RetrieverAgent
+from ..models.brd import ParsedBRD
 from ..services.llm import LLMService, get_llm_service
 from ..config import get_settings
 
 
 logger = logging.getLogger(__name__)
 
+# State keys holding models handed between nodes; the same data is in the dict outputs
+_MODEL_HANDOFF_KEYS = frozenset({"brd_model", "engineering_plan_model"})
+
+# Precomputed default IDs for objectives and requirements; larger BRDs fall back to formatting
+_BO_IDS = tuple(f"BO-{i:02d}" for i in range(1, 201))
+_FR_IDS = tuple(f"FR-{i:02d}" for i in range(1, 201))
+
+
+def _json_default(value):
+    """orjson fallback for values agents may leave in state (models, raw bytes)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
 
 class BRDWorkflow:
     """
@@ -53,11 +74,16 @@ class BRDWorkflow:
         # Create the graph with our state type
         workflow = StateGraph(AgentState)
         
-        # Add nodes (each node is a function that takes state and returns updated state)
+        # Add nodes (each node takes the state and returns only the keys it updates)
         workflow.add_node("parser", self._parser_node)
         workflow.add_node("retriever", self._retriever_node)
         workflow.add_node("planner", self._planner_node)
-        workflow.add_node("scheduler", self._scheduler_node)
+        # The scheduler awaits the async LLM client under ainvoke(); the other
+        # nodes are sync and LangGraph runs them in its executor there
+        workflow.add_node(
+            "scheduler",
+            RunnableLambda(self._scheduler_node, afunc=self._scheduler_node_async)
+        )
         workflow.add_node("finalize", self._finalize_node)
         
         # Define the edges (flow)
@@ -71,7 +97,7 @@ class BRDWorkflow:
         # Compile the graph
         return workflow.compile()
     
-    def _parser_node(self, state: AgentState) -> AgentState:
+    def _parser_node(self, state: AgentState) -> dict:
         """Parser node - normalizes BRD input."""
         logger.info("Workflow: Running Parser node")
         
@@ -82,269 +108,253 @@ class BRDWorkflow:
             parsed_brd = self.parser.run(raw_input)
             
             # Update state
-            stages = state.get("stages_completed", [])
-            stages.append("brd_parsing")
-            
             return {
-                **state,
                 "parsed_brd": parsed_brd,
-                "stages_completed": stages
+                "brd_model": self._to_brd_model(parsed_brd),
+                "stages_completed": ["brd_parsing"]
             }
             
         except Exception as e:
             logger.error(f"Parser node failed: {e}")
-            errors = state.get("errors", [])
-            errors.append(f"Parser error: {str(e)}")
             return {
-                **state,
-                "errors": errors,
+                "errors": [f"Parser error: {str(e)}"],
                 "status": "error",
                 "message": f"BRD parsing failed: {str(e)}"
             }
     
-    def _retriever_node(self, state: AgentState) -> AgentState:
+    def _retriever_node(self, state: AgentState) -> dict:
         """Retriever node - retrieves relevant context from ingested repositories (RAG)."""
         logger.info("Workflow: Running Retriever node")
         
-        # Skip if previous stage failed
+        # Skip if previous stage failed (no channels to update)
         if state.get("status") == "error":
-            return state
+            return {}
         
         # Check if RAG is enabled
         if not self.settings.rag_enabled:
             logger.info("RAG is disabled in config, skipping retrieval")
             return {
-                **state,
-                "retrieved_context": None,
-                "stages_completed": state.get("stages_completed", [])
+                "retrieved_context": None
+            }
+        
+        # Nothing to build a query from - skip the vector store round-trip
+        parsed_brd = state.get("parsed_brd") or {}
+        project = parsed_brd.get("project") or {}
+        if not (parsed_brd.get("features") or project.get("objectives") or project.get("description")):
+            logger.info("BRD has no features, objectives or description, skipping retrieval")
+            return {
+                "retrieved_context": None
             }
         
         try:
-            parsed_brd = state.get("parsed_brd", {})
-            
             # Get repo_url from state or use default
             repo_url = state.get("repo_url") or self.settings.default_repo_url
             
-            # Convert dict to ParsedBRD model for retriever
-            from ..models.brd import ParsedBRD
-            
-            try:
-                brd_model = self._dict_to_parsed_brd(parsed_brd)
-            except Exception:
-                # Create minimal ParsedBRD if conversion fails
-                brd_model = ParsedBRD(
-                    document_info={"title": parsed_brd.get("project", {}).get("name", "Unknown Project")},
-                    executive_summary=parsed_brd.get("project", {}).get("description", ""),
-                )
-            
-            # Check if collection exists before querying
-            from ..services.vector_store import VectorStore
-            vector_store = VectorStore()
+            # Check if collection exists before querying (same store the retriever uses)
+            vector_store = self.retriever.vector_store
             
             try:
                 collection = vector_store.get_collection(repo_url)
                 if collection is None or collection.count() == 0:
                     logger.warning(f"Collection for {repo_url} does not exist or is empty. Skipping RAG.")
                     return {
-                        **state,
                         "retrieved_context": None,
-                        "repo_url": repo_url,
-                        "stages_completed": state.get("stages_completed", [])
+                        "repo_url": repo_url
                     }
             except Exception as e:
                 logger.warning(f"Could not check collection existence: {e}. Skipping RAG.")
+                vector_store.forget_collection(repo_url)
                 return {
-                    **state,
                     "retrieved_context": None,
-                    "repo_url": repo_url,
-                    "stages_completed": state.get("stages_completed", [])
+                    "repo_url": repo_url
                 }
             
             # Run the retriever agent
-            retrieved_context = self.retriever.run(brd_model, repo_url=repo_url)
-            
-            # Update state
-            stages = state.get("stages_completed", [])
-            stages.append("context_retrieval")
+            retrieved_context = self.retriever.run(state["brd_model"], repo_url=repo_url)
             
             logger.info(f"Retrieved {len(retrieved_context)} chunks from {repo_url}")
             
             return {
-                **state,
                 "retrieved_context": retrieved_context,
                 "repo_url": repo_url,
-                "stages_completed": stages
+                "stages_completed": ["context_retrieval"]
             }
             
         except Exception as e:
             # Don't fail the workflow if retrieval fails - graceful degradation
             logger.warning(f"Retriever node failed (continuing without RAG): {e}")
             return {
-                **state,
                 "retrieved_context": None,
-                "repo_url": state.get("repo_url"),
-                "stages_completed": state.get("stages_completed", [])
+                "repo_url": state.get("repo_url")
             }
     
-    def _planner_node(self, state: AgentState) -> AgentState:
+    def _planner_node(self, state: AgentState) -> dict:
         """Planner node - generates engineering plan."""
         logger.info("Workflow: Running Planner node")
         
-        # Skip if previous stage failed
+        # Skip if previous stage failed (no channels to update)
         if state.get("status") == "error":
-            return state
+            return {}
         
         try:
-            parsed_brd = state.get("parsed_brd", {})
-            
-            # Convert dict to format expected by planner
-            # The planner expects a ParsedBRD model, but we'll pass the dict
-            # and let it work with the raw data
-            from ..models.brd import ParsedBRD
-            
-            # Try to create ParsedBRD from the normalized data
-            # If it fails, create a minimal one
-            try:
-                brd_model = self._dict_to_parsed_brd(parsed_brd)
-            except Exception:
-                # Create minimal ParsedBRD from the data
-                brd_model = ParsedBRD(
-                    document_info={"title": parsed_brd.get("project", {}).get("name", "Unknown Project")},
-                    executive_summary=parsed_brd.get("project", {}).get("description", ""),
-                )
-            
             # Get retrieved context from state (from RetrieverAgent)
             retrieved_context = state.get("retrieved_context")
             
             # Run the planner agent with retrieved context
             engineering_plan = self.planner.run(
-                brd_model, 
+                state["brd_model"],
                 retrieved_context=retrieved_context
             )
             
             # Update state
-            stages = state.get("stages_completed", [])
-            stages.append("engineering_plan")
-            
             return {
-                **state,
                 "engineering_plan": engineering_plan.model_dump(),
-                "stages_completed": stages
+                "engineering_plan_model": engineering_plan,
+                "stages_completed": ["engineering_plan"]
             }
             
         except Exception as e:
             logger.error(f"Planner node failed: {e}")
-            errors = state.get("errors", [])
-            errors.append(f"Planner error: {str(e)}")
             return {
-                **state,
-                "errors": errors,
+                "errors": [f"Planner error: {str(e)}"],
                 "status": "error",
                 "message": f"Engineering plan generation failed: {str(e)}"
             }
     
-    def _scheduler_node(self, state: AgentState) -> AgentState:
+    def _scheduler_node(self, state: AgentState) -> dict:
         """Scheduler node - generates project schedule."""
         logger.info("Workflow: Running Scheduler node")
         
-        # Skip if previous stage failed
+        # Skip if previous stage failed (no channels to update)
         if state.get("status") == "error":
-            return state
+            return {}
         
         try:
-            engineering_plan_data = state.get("engineering_plan", {})
-            
-            # Convert dict to EngineeringPlan model
-            from ..models.plan import EngineeringPlan
+            # Run the scheduler agent on the planner's model (no dict round-trip)
+            project_schedule = self.scheduler.run(state["engineering_plan_model"])
             
-            engineering_plan = EngineeringPlan.model_validate(engineering_plan_data)
+            # Update state
+            return {
+                "project_schedule": project_schedule.model_dump(),
+                "stages_completed": ["project_schedule"]
+            }
             
+        except Exception as e:
+            logger.error(f"Scheduler node failed: {e}")
+            return {
+                "errors": [f"Scheduler error: {str(e)}"],
+                "status": "error",
+                "message": f"Project schedule generation failed: {str(e)}"
+            }
+    
+    async def _scheduler_node_async(self, state: AgentState) -> dict:
+        """Scheduler node for arun() - awaits the LLM instead of blocking a thread."""
+        logger.info("Workflow: Running Scheduler node (async)")
+        
+        # Skip if previous stage failed (no channels to update)
+        if state.get("status") == "error":
+            return {}
+        
+        try:
             # Run the scheduler agent
-            project_schedule = self.scheduler.run(engineering_plan)
+            project_schedule = await self.scheduler.run_async(state["engineering_plan_model"])
             
             # Update state
-            stages = state.get("stages_completed", [])
-            stages.append("project_schedule")
-            
             return {
-                **state,
                 "project_schedule": project_schedule.model_dump(),
-                "stages_completed": stages
+                "stages_completed": ["project_schedule"]
             }
-            
+        
         except Exception as e:
             logger.error(f"Scheduler node failed: {e}")
-            errors = state.get("errors", [])
-            errors.append(f"Scheduler error: {str(e)}")
             return {
-                **state,
-                "errors": errors,
+                "errors": [f"Scheduler error: {str(e)}"],
                 "status": "error",
                 "message": f"Project schedule generation failed: {str(e)}"
             }
     
-    def _finalize_node(self, state: AgentState) -> AgentState:
+    def _finalize_node(self, state: AgentState) -> dict:
         """Finalize node - prepare final output."""
         logger.info("Workflow: Running Finalize node")
         
+        # Timezone-aware UTC, matching the plan and schedule metadata timestamps
+        timestamp = datetime.now(timezone.utc).isoformat()
+        
         # If no error status set, mark as success
         if state.get("status") != "error":
             return {
-                **state,
                 "status": "success",
                 "message": "BRD processed successfully through entire pipeline",
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": timestamp
             }
         
         # If error, just add timestamp
         return {
-            **state,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": timestamp
         }
     
-    def _dict_to_parsed_brd(self, data: dict):
-        """Convert normalized dict to ParsedBRD model."""
-        from ..models.brd import ParsedBRD, DocumentInfo, BusinessObjective, ProjectScope, Requirements, FunctionalRequirement
-        
-        project = data.get("project", {})
-        features = data.get("features", [])
-        
-        # Build objectives
-        objectives = []
-        for i, obj in enumerate(project.get("objectives", [])):
-            objectives.append(BusinessObjective(
-                id=f"BO-{i+1:02d}",
-                objective=obj,
-                priority="Should"
-            ))
-        
-        # Build functional requirements from features
-        functional = []
-        for feature in features:
-            functional.append(FunctionalRequirement(
-                id=feature.get("id", f"FR-{len(functional)+1:02d}"),
-                description=f"{feature.get('name', '')}: {feature.get('description', '')}",
-                priority=feature.get("priority", "Medium")
-            ))
-        
-        return ParsedBRD(
-            document_info=DocumentInfo(
-                title=project.get("name", "Unknown Project"),
-                version="1.0",
-                status="Draft"
-            ),
-            executive_summary=project.get("description", ""),
-            business_objectives=objectives,
-            project_scope=ProjectScope(
-                in_scope=[f.get("name", "") for f in features],
-                out_of_scope=[]
-            ),
-            stakeholders=[],
-            requirements=Requirements(
-                functional=functional,
-                non_functional=[]
+    def _to_brd_model(self, parsed_brd: dict) -> ParsedBRD:
+        """
+        Convert the normalized BRD dict to the ParsedBRD model used by the retriever and planner.
+        
+        Falls back to a minimal ParsedBRD (title and summary only) if the full conversion fails.
+        """
+        try:
+            return self._dict_to_parsed_brd(parsed_brd)
+        except Exception:
+            project = parsed_brd.get("project")
+            if not isinstance(project, dict):
+                project = {}
+            return ParsedBRD(
+                document_info={"title": project.get("name", "Unknown Project")},
+                executive_summary=project.get("description", ""),
             )
-        )
+    
+    def _dict_to_parsed_brd(self, data: dict) -> ParsedBRD:
+        """
+        Convert normalized dict to ParsedBRD model.
+        
+        The whole document is validated in one model_validate() call on plain
+        dicts, rather than one model __init__ per objective and requirement.
+        The input is user-supplied, so it is still fully validated.
+        """
+        # Bind each section once; missing or null sections fall back to empty
+        project = data.get("project") or {}
+        
+        # One pass over the features builds both the scope and the requirements
+        in_scope = []
+        functional = []
+        for i, feature in enumerate(data.get("features") or ()):
+            name = feature.get("name", "")
+            in_scope.append(name)
+            functional.append({
+                "id": feature.get("id", _FR_IDS[i] if i < len(_FR_IDS) else f"FR-{i+1:02d}"),
+                "description": f"{name}: {feature.get('description', '')}",
+                "priority": feature.get("priority", "Medium")
+            })
+        
+        return ParsedBRD.model_validate({
+            "document_info": {
+                "title": project.get("name", "Unknown Project"),
+                "version": "1.0",
+                "status": "Draft"
+            },
+            "executive_summary": project.get("description", ""),
+            # Build objectives
+            "business_objectives": [
+                {"id": _BO_IDS[i] if i < len(_BO_IDS) else f"BO-{i+1:02d}", "objective": obj, "priority": "Should"}
+                for i, obj in enumerate(project.get("objectives") or ())
+            ],
+            "project_scope": {
+                "in_scope": in_scope,
+                "out_of_scope": []
+            },
+            "stakeholders": [],
+            "requirements": {
+                "functional": functional,
+                "non_functional": []
+            }
+        })
     
     def run(self, input_data: dict) -> dict:
         """
@@ -358,20 +368,123 @@ class BRDWorkflow:
         """
         logger.info("Starting BRD workflow")
         
-        # Prepare initial state
-        initial_state: AgentState = {
-            "raw_input": input_data,
-            "is_pdf": "pdf_file" in input_data,
-            "stages_completed": [],
-            "errors": []
-        }
-        
         # Run the graph
-        final_state = self.graph.invoke(initial_state)
+        final_state = self.graph.invoke(self._initial_state(input_data))
         
         logger.info(f"Workflow completed with status: {final_state.get('status', 'unknown')}")
         
         return final_state
+    
+    def run_json(self, input_data: dict) -> bytes:
+        """
+        Run the pipeline and return the final state serialized as JSON.
+        
+        Encoded with orjson in one call. The internal model hand-off keys
+        (brd_model, engineering_plan_model) are left out; their content is
+        already in parsed_brd and engineering_plan. Pydantic models and raw
+        bytes anywhere else in the state (e.g. in retrieved chunk metadata)
+        are encoded as JSON and hex instead of failing the call.
+        
+        Args:
+            input_data: BRD input (raw JSON or PDF data)
+        
+        Returns:
+            UTF-8 encoded JSON of the final state
+        """
+        final_state = self.run(input_data)
+        return orjson.dumps(
+            {key: value for key, value in final_state.items() if key not in _MODEL_HANDOFF_KEYS},
+            default=_json_default
+        )
+    
+    async def arun(self, input_data: dict) -> dict:
+        """
+        Awaitable version of run() for async callers.
+        
+        Runs the graph with ainvoke(): sync nodes run in LangGraph's
+        executor and the scheduler awaits the async LLM client, so the
+        event loop stays free while the pipeline waits on I/O.
+        
+        Args:
+            input_data: BRD input (raw JSON or PDF data)
+        
+        Returns:
+            Final state with all outputs
+        """
+        logger.info("Starting BRD workflow (async)")
+        
+        final_state = await self.graph.ainvoke(self._initial_state(input_data))
+        
+        logger.info(f"Workflow completed with status: {final_state.get('status', 'unknown')}")
+        
+        return final_state
+    
+    def stream(self, input_data: dict) -> Iterator[dict]:
+        """
+        Run the pipeline, yielding each node's state update as it completes.
+        
+        Callers can act on the parsed BRD or the plan before the later
+        stages finish. Each item maps the node name to the keys it updated,
+        e.g. {"planner": {"engineering_plan": {...}, ...}}.
+        
+        Args:
+            input_data: BRD input (raw JSON or PDF data)
+        
+        Yields:
+            Per-node state updates in execution order
+        """
+        logger.info("Starting BRD workflow (streaming)")
+        
+        yield from self.graph.stream(self._initial_state(input_data), stream_mode="updates")
+    
+    async def astream(self, input_data: dict) -> AsyncIterator[dict]:
+        """
+        Async version of stream(), running the graph like arun().
+        
+        Args:
+            input_data: BRD input (raw JSON or PDF data)
+        
+        Yields:
+            Per-node state updates in execution order
+        """
+        logger.info("Starting BRD workflow (async streaming)")
+        
+        async for update in self.graph.astream(self._initial_state(input_data), stream_mode="updates"):
+            yield update
+    
+    async def run_batch_async(self, inputs: List[dict], max_concurrency: int = 8) -> List[dict]:
+        """
+        Run the pipeline for several BRDs concurrently.
+        
+        At most max_concurrency pipelines are in flight at once, so large
+        backfills don't flood the LLM API or LangGraph's executor.
+        
+        Args:
+            inputs: BRD inputs (raw JSON or PDF data)
+            max_concurrency: Maximum number of pipelines running at the same time
+        
+        Returns:
+            Final state for each input, in input order
+        """
+        logger.info(f"Running BRD workflow for {len(inputs)} inputs (max {max_concurrency} concurrent)")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_one(input_data: dict) -> dict:
+            async with semaphore:
+                return await self.arun(input_data)
+        
+        return list(await asyncio.gather(*(run_one(input_data) for input_data in inputs)))
+    
+    @staticmethod
+    def _initial_state(input_data: dict) -> AgentState:
+        """Prepare the initial graph state for a BRD input."""
+        return {
+            "raw_input": input_data,
+            "is_pdf": "pdf_file" in input_data,
+            "stages_completed": [],
+            "errors": []
+        }
 
 
 def create_workflow(llm_service: Optional[LLMService] = None) -> BRDWorkflow:
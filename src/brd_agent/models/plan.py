@@ -93,6 +93,25 @@ class EngineeringPlanContent(BaseModel):
     risk_analysis: list[Risk] = Field(default_factory=list)
     resource_requirements: ResourceRequirements = Field(default_factory=ResourceRequirements)
     success_metrics: list[SuccessMetric] = Field(default_factory=list)
+    
+    @classmethod
+    def from_trusted_dict(cls, data: dict) -> "EngineeringPlanContent":
+        """
+        Rebuild a plan from a model_dump() of a previously validated plan.
+        
+        Uses model_construct at every level, skipping validation. Only pass
+        data that already went through model_validate (e.g. a cached plan),
+        never raw LLM output.
+        """
+        return cls.model_construct(
+            project_overview=ProjectOverview.model_construct(**data["project_overview"]),
+            feature_breakdown=[FeatureBreakdown.model_construct(**f) for f in data["feature_breakdown"]],
+            technical_architecture=TechnicalArchitecture.model_construct(**data["technical_architecture"]),
+            implementation_phases=[ImplementationPhase.model_construct(**p) for p in data["implementation_phases"]],
+            risk_analysis=[Risk.model_construct(**r) for r in data["risk_analysis"]],
+            resource_requirements=ResourceRequirements.model_construct(**data["resource_requirements"]),
+            success_metrics=[SuccessMetric.model_construct(**m) for m in data["success_metrics"]],
+        )
 
 
 class EngineeringPlan(BaseModel):
@@ -6,7 +6,7 @@ Updated to match the field names in the LLM prompt (from n8n)
 """
 
 from typing import Optional, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # === Project Info ===
@@ -19,8 +19,7 @@ class ProjectInfo(BaseModel):
     total_duration_weeks: int = Field(default=0, description="Total duration in weeks")
     total_effort_person_weeks: int = Field(default=0, description="Total effort in person-weeks")
     
-    class Config:
-        extra = "allow"  # Allow extra fields from LLM
+    model_config = ConfigDict(extra="allow")  # Allow extra fields from LLM
 
 
 # === Tasks ===
@@ -38,8 +37,7 @@ class Task(BaseModel):
     dependencies: list[str] = Field(default_factory=list, description="Task dependencies")
     priority: str = Field(default="Medium", description="Critical/High/Medium/Low")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Milestones ===
@@ -52,8 +50,7 @@ class Milestone(BaseModel):
     deliverables: list[str] = Field(default_factory=list, description="Milestone deliverables")
     dependencies: list[str] = Field(default_factory=list, description="Dependencies")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Phases ===
@@ -68,8 +65,7 @@ class Phase(BaseModel):
     milestones: list[Milestone] = Field(default_factory=list, description="Phase milestones")
     tasks: list[Task] = Field(default_factory=list, description="Phase tasks")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Resource Allocation ===
@@ -85,8 +81,7 @@ class ResourceAllocation(BaseModel):
     end_date: Optional[str] = Field(default=None, description="End date")
     key_responsibilities: list[str] = Field(default_factory=list, description="Key responsibilities")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Critical Path ===
@@ -98,8 +93,7 @@ class CriticalPathItem(BaseModel):
     duration_days: int = Field(default=0, description="Duration in days")
     slack_days: int = Field(default=0, description="Slack days")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Risk Timeline ===
@@ -113,8 +107,7 @@ class RiskTimelineItem(BaseModel):
     impact_on_schedule: str = Field(default="", description="Impact on schedule")
     contingency_buffer_days: int = Field(default=0, description="Contingency buffer in days")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Key Deliverables ===
@@ -131,8 +124,7 @@ class KeyDeliverable(BaseModel):
     responsible_team: str = Field(default="", description="Responsible team")
     dependencies: list[str] = Field(default_factory=list, description="Dependencies")
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
 
 
 # === Main Project Schedule ===
@@ -150,8 +142,33 @@ class ProjectScheduleContent(BaseModel):
     assumptions: list[str] = Field(default_factory=list)
     constraints: list[str] = Field(default_factory=list)
     
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
+    
+    @classmethod
+    def from_trusted_dict(cls, data: dict) -> "ProjectScheduleContent":
+        """
+        Rebuild a schedule from a model_dump() of a previously validated schedule.
+        
+        Uses model_construct at every level, skipping validation. Extra fields
+        the LLM added are kept. Only pass data that already went through
+        model_validate (e.g. a cached schedule), never raw LLM output.
+        """
+        return cls.model_construct(**{
+            **data,
+            "project_info": ProjectInfo.model_construct(**data["project_info"]),
+            "phases": [
+                Phase.model_construct(**{
+                    **p,
+                    "milestones": [Milestone.model_construct(**m) for m in p["milestones"]],
+                    "tasks": [Task.model_construct(**t) for t in p["tasks"]],
+                })
+                for p in data["phases"]
+            ],
+            "resource_allocation": [ResourceAllocation.model_construct(**r) for r in data["resource_allocation"]],
+            "critical_path": [CriticalPathItem.model_construct(**c) for c in data["critical_path"]],
+            "risk_timeline": [RiskTimelineItem.model_construct(**r) for r in data["risk_timeline"]],
+            "key_deliverables": [KeyDeliverable.model_construct(**d) for d in data["key_deliverables"]],
+        })
 
 
 class ProjectSchedule(BaseModel):
@@ -180,5 +197,4 @@ class ProjectSchedule(BaseModel):
         description="Generation metadata (timestamp, model, etc.)"
     )
 
-    class Config:
-        extra = "allow"
+    model_config = ConfigDict(extra="allow")
@@ -3,9 +3,14 @@ BRD Agent - Services Module
 Shared services like LLM client, PDF parsing, file I/O, vector store, embeddings, chunking, GitHub client
 """
 
-from .llm import LLMService, AnthropicLLM, OllamaLLM, get_llm_service
-from .vector_store import VectorStore
-from .embeddings import EmbeddingService
+from .llm import LLMService, AnthropicLLM, OllamaLLM, get_llm_service, text_block, cached_text_block, strip_code_fence
+from .vector_store import VectorStore, get_shared_vector_store
+from .embeddings import EmbeddingService, get_shared_embedding_service
+from .plan_cache import PlanCache
+from .embedding_cache import EmbeddingCache
+from .schedule_cache import SemanticScheduleCache
+from .lru_cache import LRUCache
+from .json_stream import StreamingArrayParser
 from .chunking import chunk_markdown, chunk_recursive
 from .github_client import GitHubClient
 from .document_loaders import load_markdown, Document
@@ -15,8 +20,18 @@ __all__ = [
     "AnthropicLLM",
     "OllamaLLM",
     "get_llm_service",
+    "text_block",
+    "cached_text_block",
+    "strip_code_fence",
     "VectorStore",
+    "get_shared_vector_store",
     "EmbeddingService",
+    "get_shared_embedding_service",
+    "PlanCache",
+    "EmbeddingCache",
+    "SemanticScheduleCache",
+    "LRUCache",
+    "StreamingArrayParser",
     "chunk_markdown",
     "chunk_recursive",
     "GitHubClient",
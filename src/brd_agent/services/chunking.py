@@ -5,9 +5,17 @@ Text chunking strategies for RAG document processing.
 
 import re
 import ast
+from bisect import bisect_right
 from typing import List, Dict, Any, Optional
 
 
+# Markdown header lines that start a new chunk (##, ###, ####); whitespace never spans lines
+_HEADER_RE = re.compile(r'^(#{2,4})[^\S\n]+([^\n]+)$', re.MULTILINE)
+
+# Last sentence boundary ('. ', '.\n', '! ', '?\n'); the greedy prefix makes it match from the end
+_LAST_SENTENCE_BREAK_RE = re.compile(r'.*(\.[ \n]|! |\?\n)', re.DOTALL)
+
+
 def chunk_markdown(text: str, source_path: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Split markdown text by headers (##, ###, ####).
@@ -30,51 +38,43 @@ def chunk_markdown(text: str, source_path: Optional[str] = None) -> List[Dict[st
     if not text or not text.strip():
         return []
     
-    lines = text.split('\n')
+    # Scan the whole text for headers at once and slice sections by offset
+    line_count = text.count('\n') + 1
     chunks = []
-    current_chunk_lines = []
+    current_start = 0
     current_start_line = 1
     found_first_header = False
     
-    # Pattern to match markdown headers (##, ###, ####)
-    header_pattern = re.compile(r'^(#{2,4})\s+(.+)$')
-    
-    for i, line in enumerate(lines, start=1):
-        match = header_pattern.match(line)
+    for match in _HEADER_RE.finditer(text):
+        found_first_header = True
+        header_start = match.start()
+        header_line = current_start_line + text.count('\n', current_start, header_start)
         
-        if match:
-            found_first_header = True
-            
-            # Save previous chunk if it exists
-            if current_chunk_lines:
-                chunk_content = '\n'.join(current_chunk_lines).strip()
-                if chunk_content:
-                    chunks.append({
-                        'content': chunk_content,
-                        'source': source_path,
-                        'line_start': current_start_line,
-                        'line_end': i - 1,
-                        'chunk_type': 'markdown_header',
-                    })
-            
-            # Start new chunk with header
-            current_chunk_lines = [line]
-            current_start_line = i
-        else:
-            # Add line to current chunk
-            current_chunk_lines.append(line)
-    
-    # Add final chunk
-    if current_chunk_lines:
-        chunk_content = '\n'.join(current_chunk_lines).strip()
+        # Save previous chunk if it exists
+        chunk_content = text[current_start:header_start].strip()
         if chunk_content:
             chunks.append({
                 'content': chunk_content,
                 'source': source_path,
                 'line_start': current_start_line,
-                'line_end': len(lines),
+                'line_end': header_line - 1,
                 'chunk_type': 'markdown_header',
             })
+        
+        # Start new chunk with header
+        current_start = header_start
+        current_start_line = header_line
+    
+    # Add final chunk
+    chunk_content = text[current_start:].strip()
+    if chunk_content:
+        chunks.append({
+            'content': chunk_content,
+            'source': source_path,
+            'line_start': current_start_line,
+            'line_end': line_count,
+            'chunk_type': 'markdown_header',
+        })
     
     # If no headers found, return entire text as single chunk
     if not found_first_header and not chunks:
@@ -82,7 +82,7 @@ def chunk_markdown(text: str, source_path: Optional[str] = None) -> List[Dict[st
             'content': text.strip(),
             'source': source_path,
             'line_start': 1,
-            'line_end': len(lines),
+            'line_end': line_count,
             'chunk_type': 'markdown_header',
         })
     
@@ -130,13 +130,10 @@ def chunk_recursive(
     lines = text.split('\n')
     chunks = []
     
-    # Build character-to-line mapping for accurate line tracking
-    char_to_line = []
-    current_pos = 0
-    for line_num, line in enumerate(lines, start=1):
-        for _ in range(len(line) + 1):  # +1 for newline
-            char_to_line.append(line_num)
-        current_pos += len(line) + 1
+    # Start offset of each line; a position's line number is found by bisection
+    line_starts = [0]
+    for line in lines[:-1]:
+        line_starts.append(line_starts[-1] + len(line) + 1)  # +1 for newline
     
     # Split text into chunks
     text_content = text
@@ -155,26 +152,21 @@ def chunk_recursive(
         
         # If not at end of text, try to break at paragraph boundary
         if end_pos < len(text_content):
-            # Look for paragraph break (double newline) near the end
-            last_paragraph_break = chunk_text.rfind('\n\n')
-            if last_paragraph_break > chunk_size * 0.5:  # If break is in second half
+            # Look for paragraph break (double newline), only in the second half
+            last_paragraph_break = chunk_text.rfind('\n\n', int(chunk_size * 0.5) + 1)
+            if last_paragraph_break != -1:
                 end_pos = start_pos + last_paragraph_break + 2
                 chunk_text = text_content[start_pos:end_pos]
             else:
-                # Try sentence boundary
-                last_sentence_break = max(
-                    chunk_text.rfind('. '),
-                    chunk_text.rfind('.\n'),
-                    chunk_text.rfind('! '),
-                    chunk_text.rfind('?\n'),
-                )
-                if last_sentence_break > chunk_size * 0.7:  # If break is in last 30%
-                    end_pos = start_pos + last_sentence_break + 2
+                # Try sentence boundary, only in the last 30%
+                sentence_match = _LAST_SENTENCE_BREAK_RE.match(chunk_text, int(chunk_size * 0.7) + 1)
+                if sentence_match:
+                    end_pos = start_pos + sentence_match.start(1) + 2
                     chunk_text = text_content[start_pos:end_pos]
         
         # Calculate line numbers
-        line_start = char_to_line[min(start_pos, len(char_to_line) - 1)] if char_to_line else 1
-        line_end = char_to_line[min(end_pos - 1, len(char_to_line) - 1)] if char_to_line else 1
+        line_start = bisect_right(line_starts, start_pos)
+        line_end = bisect_right(line_starts, end_pos - 1)
         
         # Create chunk
         chunk_content = chunk_text.strip()
@@ -0,0 +1,166 @@
+"""
+BRD Agent - Embedding Cache Service
+SQLite-backed cache of query embeddings, persisted across restarts.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent cache of embedding vectors keyed by model and text.
+    
+    Vectors are stored as float64 blobs, so a cached embedding is identical
+    to the one Ollama returned. Keys include the model name and rows record
+    the vector dimension, so switching embedding models never mixes vectors.
+    Once the table grows past max_entries, the least recently used rows are
+    evicted. Hit and miss counts are kept for observability.
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Open (or create) the embedding cache database.
+        
+        Args:
+            db_path: Optional path to the SQLite file. If None, uses config value.
+            max_entries: Optional maximum number of cached embeddings. If None, uses config value.
+        """
+        settings = get_settings()
+        self.db_path = Path(db_path or settings.embedding_cache_path)
+        self.max_entries = max_entries or settings.embedding_cache_max_entries
+        self.hits = 0
+        self.misses = 0
+        
+        # Ensure directory exists
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # One connection shared by the workflow's threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, "
+            "model TEXT NOT NULL, "
+            "dimension INTEGER NOT NULL, "
+            "embedding BLOB NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.commit()
+        
+        logger.info(f"EmbeddingCache initialized: {self.db_path} (max {self.max_entries} entries)")
+    
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """
+        Build a cache key for a text embedded with a given model.
+        
+        Args:
+            model_name: Embedding model name
+            text: Embedded text
+        
+        Returns:
+            Hex SHA-256 digest of the model name and text
+        """
+        return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+    
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up several cached embeddings at once.
+        
+        Args:
+            keys: Cache keys from make_key()
+        
+        Returns:
+            Dict mapping each cached key to its embedding; misses are absent
+        """
+        if not keys:
+            return {}
+        
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, embedding FROM embeddings WHERE key IN ({placeholders})", keys
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE embeddings SET last_access = ? WHERE key IN ({placeholders})",
+                    (time.time(), *keys),
+                )
+                self._conn.commit()
+            self.hits += len(rows)
+            self.misses += len(keys) - len(rows)
+
+        return {key: array("d", blob).tolist() for key, blob in rows}
+    
+    def put_many(self, model_name: str, embeddings: Dict[str, List[float]]) -> None:
+        """
+        Store several embeddings, evicting least recently used entries beyond max_entries.
+        
+        Args:
+            model_name: Embedding model the vectors came from
+            embeddings: Dict mapping cache keys from make_key() to embeddings
+        """
+        if not embeddings:
+            return
+        
+        now = time.time()
+        rows = [
+            (key, model_name, len(embedding), array("d", embedding).tobytes(), now)
+            for key, embedding in embeddings.items()
+        ]
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, model, dimension, embedding, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key NOT IN "
+                "(SELECT key FROM embeddings ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+    
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with 'hits', 'misses' and 'entries'
+        """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+    
+    def clear(self) -> None:
+        """Remove all cached embeddings."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    
+    def __del__(self):
+        """Close the SQLite connection on deletion"""
+        if hasattr(self, '_conn'):
+            try:
+                self._conn.close()
+            except Exception:
+                pass
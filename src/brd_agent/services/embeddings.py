@@ -6,6 +6,7 @@ Ollama-based embedding generation for RAG.
 from typing import List, Optional
 import httpx
 import logging
+import threading
 
 from ..config import get_settings
 
@@ -157,3 +158,20 @@ class EmbeddingService:
             except Exception:
                 pass
 
+
+# Process-wide default instance, shared by agents that are not given one
+_shared_embedding_service: Optional[EmbeddingService] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_embedding_service() -> EmbeddingService:
+    """
+    Get the process-wide default embedding service.
+    Creates it on first call (lazy loading), so its HTTP connection pool is reused.
+    """
+    global _shared_embedding_service
+    if _shared_embedding_service is None:
+        with _shared_lock:
+            if _shared_embedding_service is None:
+                _shared_embedding_service = EmbeddingService()
+    return _shared_embedding_service
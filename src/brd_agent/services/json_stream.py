@@ -0,0 +1,93 @@
+"""
+BRD Agent - JSON Stream Parsing
+Extracts completed array items from JSON text while an LLM is still generating it.
+"""
+
+from typing import Any, Dict, List
+
+import orjson
+
+
+class StreamingArrayParser:
+    """
+    Incrementally extracts completed items of a named JSON array from streamed text.
+    
+    Text is fed in chunks as the LLM generates it; each feed() scans only the
+    new characters and returns any objects, in an array stored under
+    array_key (at any depth), that closed in them. Only the text of the item
+    or string still open is buffered between feeds.
+    """
+    
+    def __init__(self, array_key: str):
+        """
+        Args:
+            array_key: Key of the array whose object items should be extracted
+        """
+        self.array_key = array_key
+        # Unconsumed text, starting at absolute position _offset in the stream
+        self._text = ""
+        self._offset = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = None
+        self._pending_key = None
+        self._array_depth = None
+        self._item_start = None
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Consume a chunk of response text and return newly completed array items."""
+        offset = self._offset
+        start = offset + len(self._text)
+        text = self._text + chunk
+        
+        items = []
+        for i in range(start, offset + len(text)):
+            char = text[i - offset]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1 - offset:i - offset]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":":
+                self._pending_key = self._last_string
+            elif char == ",":
+                self._pending_key = None
+            elif char in "{[":
+                if char == "[" and self._pending_key == self.array_key and self._array_depth is None:
+                    self._array_depth = self._depth + 1
+                elif char == "{" and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+                self._pending_key = None
+            elif char in "}]":
+                self._depth -= 1
+                if self._array_depth is None:
+                    continue
+                if char == "}" and self._item_start is not None and self._depth == self._array_depth:
+                    try:
+                        items.append(orjson.loads(text[self._item_start - offset:i + 1 - offset]))
+                    except orjson.JSONDecodeError:
+                        pass
+                    self._item_start = None
+                elif char == "]" and self._depth < self._array_depth:
+                    self._array_depth = None
+        
+        # Drop everything before the open item (or string); later feeds never look back further
+        if self._item_start is not None:
+            keep_from = self._item_start
+        elif self._in_string:
+            keep_from = self._string_start
+        else:
+            keep_from = offset + len(text)
+        self._text = text[keep_from - offset:]
+        self._offset = keep_from
+        
+        return items
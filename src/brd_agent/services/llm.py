@@ -3,17 +3,79 @@ BRD Agent - LLM Service
 Abstraction layer for LLM providers (Anthropic, Ollama, etc.)
 """
 
+import asyncio
+import atexit
 import json
 import logging
+import re
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Iterator, List, Optional, Union
 
-from anthropic import Anthropic
+import httpx
+from anthropic import Anthropic, AsyncAnthropic, DefaultAsyncHttpxClient, DefaultHttpxClient
 
 from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# A prompt is either plain text or a list of Anthropic-style content blocks
+PromptContent = Union[str, List[dict]]
+
+
+def text_block(text: str) -> dict:
+    """Wrap text as a plain content block."""
+    return {"type": "text", "text": text}
+
+
+def cached_text_block(text: str) -> dict:
+    """
+    Wrap text as a content block marked as a prompt-cache breakpoint.
+    
+    Everything up to and including this block is cached server-side
+    (5 minute TTL), so it must be byte-identical across calls to hit.
+    """
+    return {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+
+
+# Optional leading ```json / ``` fence and trailing ``` fence around a response body
+_CODE_FENCE_RE = re.compile(r"\A\s*(?:```(?:json)?)?\s*(.*?)\s*(?:```)?\s*\Z", re.S)
+
+
+def strip_code_fence(text: str) -> str:
+    """Strip surrounding whitespace and an optional markdown code fence from an LLM response."""
+    return _CODE_FENCE_RE.match(text).group(1)
+
+
+# Process-wide HTTP client shared by every AnthropicLLM for sync calls (created on first use).
+# Async clients are not shared process-wide: their connections are bound to one event loop.
+_shared_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def _connection_limits() -> httpx.Limits:
+    """Build the connection pool limits from config."""
+    settings = get_settings()
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+    )
+
+
+def _get_shared_http_client() -> httpx.Client:
+    """
+    Get the process-wide HTTP client for sync Anthropic calls.
+    Creates it on first call, so warm calls reuse pooled keep-alive connections.
+    """
+    global _shared_http_client
+    if _shared_http_client is None:
+        with _http_client_lock:
+            if _shared_http_client is None:
+                _shared_http_client = DefaultHttpxClient(limits=_connection_limits())
+                atexit.register(_shared_http_client.close)
+    return _shared_http_client
+
 
 class LLMService(ABC):
     """
@@ -24,8 +86,8 @@ class LLMService(ABC):
     @abstractmethod
     def generate(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ) -> str:
@@ -33,8 +95,8 @@ class LLMService(ABC):
         Generate a response from the LLM.
         
         Args:
-            prompt: The user prompt/message
-            system_prompt: Optional system prompt for context
+            prompt: The user prompt/message (text or content blocks)
+            system_prompt: Optional system prompt for context (text or content blocks)
             max_tokens: Maximum tokens in response (uses default if not specified)
             temperature: Temperature for generation (uses default if not specified)
             
@@ -46,8 +108,8 @@ class LLMService(ABC):
     @abstractmethod
     def generate_json(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ) -> dict:
@@ -64,6 +126,73 @@ class LLMService(ABC):
             Parsed JSON as a dictionary
         """
         pass
+    
+    def stream(
+        self,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Generate a response from the LLM as a stream of text chunks.
+        
+        Providers without native streaming yield the whole response from
+        generate() as a single chunk.
+        
+        Args:
+            prompt: The user prompt/message (text or content blocks)
+            system_prompt: Optional system prompt for context (text or content blocks)
+            max_tokens: Maximum tokens in response (uses default if not specified)
+            temperature: Temperature for generation (uses default if not specified)
+        
+        Yields:
+            Text chunks in generation order
+        """
+        yield self.generate(
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+    
+    async def generate_async(
+        self,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """
+        Awaitable version of generate().
+        
+        Providers without a native async client run generate() in a worker
+        thread, so the event loop stays free while the request is in flight.
+        
+        Args:
+            prompt: The user prompt/message (text or content blocks)
+            system_prompt: Optional system prompt for context (text or content blocks)
+            max_tokens: Maximum tokens in response (uses default if not specified)
+            temperature: Temperature for generation (uses default if not specified)
+        
+        Returns:
+            The generated text response
+        """
+        return await asyncio.to_thread(
+            self.generate,
+            prompt=prompt,
+            system_prompt=system_prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+    
+    async def aclose(self) -> None:
+        """
+        Release async resources opened on the running event loop.
+        
+        Call this from the code that owns the loop before it closes (e.g. at
+        the end of an asyncio.run() entry point). No-op by default.
+        """
 
 
 class AnthropicLLM(LLMService):
@@ -101,29 +230,134 @@ class AnthropicLLM(LLMService):
                 "Set ANTHROPIC_API_KEY environment variable or pass api_key parameter."
             )
         
-        self.client = Anthropic(api_key=self.api_key)
+        # Every instance shares one connection pool, so agents don't each pay for TLS setup
+        self.client = Anthropic(api_key=self.api_key, http_client=_get_shared_http_client())
+        # One async client per event loop, created on the first generate_async() call in it.
+        # Pooled connections are bound to the loop that opened them, so they are never shared.
+        self._async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncAnthropic]" = (
+            weakref.WeakKeyDictionary()
+        )
         
         logger.info(f"Initialized AnthropicLLM with model: {self.model}")
     
     def generate(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ) -> str:
         """
         Generate a response using Claude.
         
+        Content blocks built with cached_text_block() are sent with their
+        cache_control markers, enabling Anthropic prompt caching.
+        
         Args:
-            prompt: The user prompt/message
-            system_prompt: Optional system prompt
+            prompt: The user prompt/message (text or content blocks)
+            system_prompt: Optional system prompt (text or content blocks)
             max_tokens: Max tokens (uses default if not specified)
             temperature: Temperature (uses default if not specified)
             
         Returns:
             Generated text response
         """
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature)
+        
+        response = self.client.messages.create(**kwargs)
+        
+        # Extract text from response
+        result = response.content[0].text
+        
+        self._log_usage(len(result), getattr(response, "usage", None))
+        
+        return result
+    
+    def stream(
+        self,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> Iterator[str]:
+        """
+        Generate a response using Claude, streaming text as it is produced.
+        
+        Args:
+            prompt: The user prompt/message (text or content blocks)
+            system_prompt: Optional system prompt (text or content blocks)
+            max_tokens: Max tokens (uses default if not specified)
+            temperature: Temperature (uses default if not specified)
+        
+        Yields:
+            Text chunks in generation order
+        """
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature)
+        
+        length = 0
+        with self.client.messages.stream(**kwargs) as stream:
+            for text in stream.text_stream:
+                length += len(text)
+                yield text
+            final_message = stream.get_final_message()
+        
+        self._log_usage(length, getattr(final_message, "usage", None))
+    
+    async def generate_async(
+        self,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+    ) -> str:
+        """
+        Generate a response using Claude with the async client.
+        
+        Concurrent calls on the same event loop share that loop's connection
+        pool instead of tying up a thread each.
+        
+        Args:
+            prompt: The user prompt/message (text or content blocks)
+            system_prompt: Optional system prompt (text or content blocks)
+            max_tokens: Max tokens (uses default if not specified)
+            temperature: Temperature (uses default if not specified)
+        
+        Returns:
+            Generated text response
+        """
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            client = AsyncAnthropic(
+                api_key=self.api_key,
+                http_client=DefaultAsyncHttpxClient(limits=_connection_limits()),
+            )
+            self._async_clients[loop] = client
+        
+        kwargs = self._build_request(prompt, system_prompt, max_tokens, temperature)
+        
+        response = await client.messages.create(**kwargs)
+        
+        result = response.content[0].text
+        
+        self._log_usage(len(result), getattr(response, "usage", None))
+        
+        return result
+    
+    async def aclose(self) -> None:
+        """Close the async client opened on the running event loop, if any."""
+        client = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+    
+    def _build_request(
+        self,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+    ) -> dict:
+        """Build the Messages API request arguments shared by generate(), stream() and generate_async()."""
         max_tokens = max_tokens or self.default_max_tokens
         temperature = temperature or self.default_temperature
         
@@ -132,7 +366,6 @@ class AnthropicLLM(LLMService):
         # Build the message
         messages = [{"role": "user", "content": prompt}]
         
-        # Make the API call
         kwargs = {
             "model": self.model,
             "max_tokens": max_tokens,
@@ -147,19 +380,21 @@ class AnthropicLLM(LLMService):
         if temperature != 1.0:
             kwargs["temperature"] = temperature
         
-        response = self.client.messages.create(**kwargs)
-        
-        # Extract text from response
-        result = response.content[0].text
-        
-        logger.debug(f"Generated response: {len(result)} characters")
-        
-        return result
+        return kwargs
+    
+    @staticmethod
+    def _log_usage(length: int, usage) -> None:
+        """Log response size and prompt cache usage."""
+        logger.debug(
+            f"Generated response: {length} characters "
+            f"(cache read: {getattr(usage, 'cache_read_input_tokens', 0) or 0} tokens, "
+            f"cache write: {getattr(usage, 'cache_creation_input_tokens', 0) or 0} tokens)"
+        )
     
     def generate_json(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ) -> dict:
@@ -177,14 +412,18 @@ class AnthropicLLM(LLMService):
             Parsed JSON dictionary
         """
         # Enhance system prompt to request JSON output
-        json_system = system_prompt or ""
-        if json_system:
-            json_system += "\n\n"
-        json_system += (
+        json_instruction = (
             "You must respond with valid JSON only. "
             "Do not include any text before or after the JSON. "
             "Do not wrap the JSON in markdown code blocks."
         )
+        if isinstance(system_prompt, list):
+            json_system = [*system_prompt, text_block(json_instruction)]
+        else:
+            json_system = system_prompt or ""
+            if json_system:
+                json_system += "\n\n"
+            json_system += json_instruction
         
         # Generate the response
         response_text = self.generate(
@@ -195,14 +434,7 @@ class AnthropicLLM(LLMService):
         )
         
         # Clean up the response (remove markdown code blocks if present)
-        cleaned = response_text.strip()
-        if cleaned.startswith("```json"):
-            cleaned = cleaned[7:]
-        elif cleaned.startswith("```"):
-            cleaned = cleaned[3:]
-        if cleaned.endswith("```"):
-            cleaned = cleaned[:-3]
-        cleaned = cleaned.strip()
+        cleaned = strip_code_fence(response_text)
         
         # Parse JSON
         try:
@@ -244,8 +476,8 @@ class OllamaLLM(LLMService):
     
     def generate(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ) -> str:
@@ -257,8 +489,8 @@ class OllamaLLM(LLMService):
     
     def generate_json(
         self,
-        prompt: str,
-        system_prompt: Optional[str] = None,
+        prompt: PromptContent,
+        system_prompt: Optional[PromptContent] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
     ) -> dict:
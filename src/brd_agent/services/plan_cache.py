@@ -0,0 +1,160 @@
+"""
+BRD Agent - Plan Cache Service
+SQLite-backed cache of generated engineering plans, persisted across restarts.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PlanCache:
+    """
+    Persistent cache of LLM-generated plans keyed by content hash.
+    
+    Entries live in a single SQLite table so a restarted worker starts warm.
+    The database runs in WAL mode, so several workers can share one file.
+    Hits bump the access bookkeeping in place with an UPDATE. Once the table
+    grows past max_entries, the least recently used rows are evicted. Entries
+    older than ttl_seconds are treated as misses and dropped.
+    """
+    
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        """
+        Open (or create) the plan cache database.
+        
+        Args:
+            db_path: Optional path to the SQLite file. If None, uses config value.
+            max_entries: Optional maximum number of cached plans. If None, uses config value.
+            ttl_seconds: Optional entry lifetime in seconds. If None, uses config value.
+        """
+        settings = get_settings()
+        self.db_path = Path(db_path or settings.plan_cache_path)
+        self.max_entries = max_entries or settings.plan_cache_max_entries
+        self.ttl_seconds = ttl_seconds or settings.plan_cache_ttl_seconds
+        
+        # Ensure directory exists
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # One connection shared by the workflow's threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            "key TEXT PRIMARY KEY, "
+            "plan TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "last_access REAL NOT NULL, "
+            "hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.commit()
+        
+        logger.info(f"PlanCache initialized: {self.db_path} (max {self.max_entries} entries)")
+    
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """
+        Build a cache key from one or more text parts.
+        
+        Args:
+            *parts: Strings that together identify the plan request
+        
+        Returns:
+            Hex SHA-256 digest of the parts
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached plan.
+        
+        Args:
+            key: Cache key from make_key()
+        
+        Returns:
+            Cached plan dict, or None on a miss
+        """
+        now = time.time()
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT plan, created_at FROM plans WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            
+            if now - row[1] > self.ttl_seconds:
+                # Expired - drop it so the caller regenerates
+                self._conn.execute("DELETE FROM plans WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            
+            self._conn.execute(
+                "UPDATE plans SET last_access = ?, hits = hits + 1 WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+        
+        return json.loads(row[0])
+    
+    def put(self, key: str, plan: dict) -> None:
+        """
+        Store a plan, evicting least recently used entries beyond max_entries.
+        
+        Args:
+            key: Cache key from make_key()
+            plan: Plan dict to cache (must be JSON-serializable)
+        """
+        now = time.time()
+        
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO plans (key, plan, created_at, last_access, hits) "
+                "VALUES (?, ?, ?, ?, 0) "
+                "ON CONFLICT(key) DO UPDATE SET plan = excluded.plan, "
+                "created_at = excluded.created_at, last_access = excluded.last_access",
+                (key, json.dumps(plan), now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM plans WHERE key NOT IN "
+                "(SELECT key FROM plans ORDER BY last_access DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            self._conn.commit()
+    
+    def clear(self) -> None:
+        """Remove all cached plans."""
+        with self._lock:
+            self._conn.execute("DELETE FROM plans")
+            self._conn.commit()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+    
+    def __del__(self):
+        """Close the SQLite connection on deletion"""
+        if hasattr(self, '_conn'):
+            try:
+                self._conn.close()
+            except Exception:
+                pass
@@ -0,0 +1,159 @@
+"""
+BRD Agent - Semantic Schedule Cache Service
+ChromaDB-backed cache that reuses generated schedules for structurally similar plans.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from .embeddings import EmbeddingService, get_shared_embedding_service
+from .lru_cache import LRUCache
+from .vector_store import VectorStore, get_shared_vector_store
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_COLLECTION_NAME = "schedule_cache"
+_DATE_FORMAT = "%Y-%m-%d"
+_DATE_KEYS = frozenset({"start_date", "end_date", "estimated_end_date", "target_date", "due_date"})
+
+
+def _shift_dates(node: Any, delta: timedelta) -> Any:
+    """Return a copy of node with every YYYY-MM-DD value under a date key shifted by delta."""
+    if isinstance(node, dict):
+        shifted = {}
+        for key, value in node.items():
+            if key in _DATE_KEYS and isinstance(value, str):
+                try:
+                    value = (datetime.strptime(value, _DATE_FORMAT) + delta).strftime(_DATE_FORMAT)
+                except ValueError:
+                    pass  # Not a plain date - keep the LLM's text as is
+                shifted[key] = value
+            else:
+                shifted[key] = _shift_dates(value, delta)
+        return shifted
+    if isinstance(node, list):
+        return [_shift_dates(item, delta) for item in node]
+    return node
+
+
+class SemanticScheduleCache:
+    """
+    Cache of generated project schedules, matched by plan structure.
+    
+    Plans are reduced to a fingerprint (phase names, team roles and a
+    feature-count bucket) that is embedded and stored in a dedicated ChromaDB
+    collection using cosine distance. A lookup returns the schedule of the
+    nearest stored plan when it is within max_distance, with every date
+    shifted to the requested start date and the project name replaced.
+    """
+    
+    def __init__(
+        self,
+        embedding_service: Optional[EmbeddingService] = None,
+        vector_store: Optional[VectorStore] = None,
+        max_distance: Optional[float] = None,
+    ):
+        """
+        Open (or create) the schedule cache collection.
+        
+        Args:
+            embedding_service: Optional embedding service. If None, uses the shared default.
+            vector_store: Optional vector store whose ChromaDB client holds the cache.
+                          If None, uses the shared default.
+            max_distance: Optional maximum cosine distance for a hit. If None, uses config value.
+        """
+        settings = get_settings()
+        self.embedding_service = embedding_service or get_shared_embedding_service()
+        self.max_distance = max_distance if max_distance is not None else settings.schedule_cache_max_distance
+        
+        # Share the vector store's client: one PersistentClient per path per process
+        client = (vector_store or get_shared_vector_store()).client
+        self.collection = client.get_or_create_collection(
+            name=_COLLECTION_NAME,
+            metadata={"hnsw:space": "cosine", "cache": True},
+        )
+        
+        # A miss is followed by a put for the same fingerprint; embed it only once
+        self._embeddings = LRUCache(64)
+        
+        logger.info(f"SemanticScheduleCache initialized (max distance {self.max_distance})")
+    
+    @staticmethod
+    def fingerprint(schedule_input: dict) -> str:
+        """
+        Reduce scheduler input to the structure that shapes a schedule.
+        
+        Args:
+            schedule_input: Scheduler input dict (phase_names, team_composition, total_features)
+        
+        Returns:
+            Canonical JSON fingerprint
+        """
+        return json.dumps({
+            "phase_names": list(schedule_input.get("phase_names") or ()),
+            "role_set": sorted(set(schedule_input.get("team_composition") or ())),
+            "feature_count_bucket": round(schedule_input.get("total_features", 0) / 5),
+        }, sort_keys=True)
+    
+    def get(self, fingerprint: str, project_name: str, start_date: str) -> Optional[dict]:
+        """
+        Look up a schedule generated for a similar plan.
+        
+        Args:
+            fingerprint: Plan fingerprint from fingerprint()
+            project_name: Name of the project being scheduled
+            start_date: Requested project start date (YYYY-MM-DD)
+        
+        Returns:
+            Re-dated schedule dict, or None on a miss
+        """
+        if self.collection.count() == 0:
+            return None
+        
+        results = self.collection.query(
+            query_embeddings=[self._embed(fingerprint)],
+            n_results=1,
+            include=["documents", "metadatas", "distances"],
+        )
+        distances = (results.get("distances") or [[]])[0]
+        if not distances or distances[0] > self.max_distance:
+            return None
+        
+        schedule_data = json.loads(results["documents"][0][0])
+        cached_start = results["metadatas"][0][0]["start_date"]
+        logger.info(f"SemanticScheduleCache hit (distance {distances[0]:.3f}, cached start {cached_start})")
+        
+        delta = datetime.strptime(start_date, _DATE_FORMAT) - datetime.strptime(cached_start, _DATE_FORMAT)
+        schedule_data = _shift_dates(schedule_data, delta)
+        project_info = schedule_data.get("project_schedule", schedule_data).get("project_info")
+        if isinstance(project_info, dict):
+            project_info["project_name"] = project_name
+        return schedule_data
+    
+    def put(self, fingerprint: str, start_date: str, schedule_data: dict) -> None:
+        """
+        Store a generated schedule under its plan fingerprint.
+        
+        Args:
+            fingerprint: Plan fingerprint from fingerprint()
+            start_date: Start date the schedule was generated for (YYYY-MM-DD)
+            schedule_data: Validated schedule dump, {"project_schedule": ProjectScheduleContent.model_dump()}
+        """
+        self.collection.upsert(
+            ids=[hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()],
+            embeddings=[self._embed(fingerprint)],
+            documents=[json.dumps(schedule_data)],
+            metadatas=[{"start_date": start_date}],
+        )
+    
+    def _embed(self, fingerprint: str) -> List[float]:
+        """Embed a fingerprint, reusing the embedding from a preceding get()."""
+        embedding = self._embeddings.get(fingerprint)
+        if embedding is None:
+            embedding = self.embedding_service.embed(fingerprint)
+            self._embeddings.put(fingerprint, embedding)
+        return embedding
@@ -5,14 +5,15 @@ Supports multiple repositories, each with its own collection.
 """
 
 import re
+import threading
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-
-import chromadb
-from chromadb.config import Settings as ChromaDBSettings
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 
 from ..config import get_settings
 
+if TYPE_CHECKING:
+    import chromadb
+
 
 class VectorStore:
     """
@@ -36,6 +37,10 @@ class VectorStore:
         # Ensure directory exists
         self.chromadb_path.mkdir(parents=True, exist_ok=True)
         
+        # Imported here: chromadb is slow to load and unused unless RAG is enabled
+        import chromadb
+        from chromadb.config import Settings as ChromaDBSettings
+        
         # Initialize ChromaDB client with persistent storage
         self.client = chromadb.PersistentClient(
             path=str(self.chromadb_path),
@@ -44,6 +49,10 @@ class VectorStore:
                 allow_reset=True,
             )
         )
+        
+        # Collection handles by repo URL, so repeat lookups skip the client round-trip.
+        # Only existing collections are cached; a missing one is looked up again.
+        self._collections: Dict[str, Any] = {}
     
     def get_collection_name(self, repo_url: str) -> str:
         """
@@ -93,7 +102,7 @@ class VectorStore:
         
         return collection_name.strip('_')
     
-    def create_collection(self, repo_url: str) -> chromadb.Collection:
+    def create_collection(self, repo_url: str) -> "chromadb.Collection":
         """
         Create a new collection for a repository.
         
@@ -111,12 +120,9 @@ class VectorStore:
         collection_name = self.get_collection_name(repo_url)
         
         # Check if collection already exists
-        try:
-            collection = self.client.get_collection(name=collection_name)
+        collection = self.get_collection(repo_url)
+        if collection is not None:
             return collection
-        except Exception:
-            # Collection doesn't exist, create it
-            pass
         
         # Create new collection
         collection = self.client.create_collection(
@@ -126,10 +132,11 @@ class VectorStore:
                 "collection_name": collection_name,
             }
         )
+        self._collections[repo_url] = collection
         
         return collection
     
-    def get_collection(self, repo_url: str) -> Optional[chromadb.Collection]:
+    def get_collection(self, repo_url: str) -> Optional["chromadb.Collection"]:
         """
         Get existing collection for a repository.
         
@@ -139,13 +146,31 @@ class VectorStore:
         Returns:
             ChromaDB Collection object if exists, None otherwise
         """
+        collection = self._collections.get(repo_url)
+        if collection is not None:
+            return collection
+        
         collection_name = self.get_collection_name(repo_url)
         
         try:
             collection = self.client.get_collection(name=collection_name)
-            return collection
         except Exception:
             return None
+        
+        self._collections[repo_url] = collection
+        return collection
+    
+    def forget_collection(self, repo_url: str) -> None:
+        """
+        Drop the cached handle for a repository's collection.
+        
+        The next get_collection() looks it up from ChromaDB again. Call this
+        when a cached handle fails (e.g. the collection was deleted elsewhere).
+        
+        Args:
+            repo_url: Full GitHub repository URL
+        """
+        self._collections.pop(repo_url, None)
     
     def add_documents(
         self,
@@ -217,14 +242,6 @@ class VectorStore:
         Raises:
             ValueError: If collection doesn't exist
         """
-        collection = self.get_collection(repo_url)
-        
-        if collection is None:
-            raise ValueError(
-                f"Collection for repository {repo_url} does not exist. "
-                "Please ingest the repository first."
-            )
-        
         # Build query
         query_kwargs = {
             "query_embeddings": [query_embedding],
@@ -235,9 +252,81 @@ class VectorStore:
             query_kwargs["where"] = where
         
         # Execute query
-        results = collection.query(**query_kwargs)
+        return self._query_collection(repo_url, query_kwargs)
+    
+    def query_batch(
+        self,
+        repo_url: str,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Search a repository's collection for several query embeddings at once.
         
-        return results
+        ChromaDB accepts multiple query embeddings natively, so N queries cost
+        a single collection lookup and query call instead of N.
+        
+        Args:
+            repo_url: Full GitHub repository URL
+            query_embeddings: List of query vector embeddings
+            top_k: Number of results to return per query (default: 5)
+            where: Optional metadata filter (e.g., {"doc_type": "markdown"})
+        
+        Returns:
+            Dictionary with the same keys as query(), where each value holds
+            one inner list per query embedding (same order as input)
+        
+        Raises:
+            ValueError: If collection doesn't exist
+        """
+        query_kwargs = {
+            "query_embeddings": query_embeddings,
+            "n_results": top_k,
+        }
+        
+        if where:
+            query_kwargs["where"] = where
+        
+        return self._query_collection(repo_url, query_kwargs)
+    
+    def _query_collection(self, repo_url: str, query_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Query a repository's collection through its cached handle.
+        
+        If the query fails, the handle is dropped and looked up once more.
+        A collection deleted and re-created elsewhere (another process, or a
+        different VectorStore) is then queried under its new handle.
+        
+        Raises:
+            ValueError: If collection doesn't exist
+        """
+        collection = self.get_collection(repo_url)
+        
+        if collection is None:
+            raise ValueError(
+                f"Collection for repository {repo_url} does not exist. "
+                "Please ingest the repository first."
+            )
+        
+        try:
+            return collection.query(**query_kwargs)
+        except Exception:
+            self.forget_collection(repo_url)
+            fresh = self.get_collection(repo_url)
+            if fresh is None:
+                raise ValueError(
+                    f"Collection for repository {repo_url} does not exist. "
+                    "Please ingest the repository first."
+                )
+            if fresh.id == collection.id:
+                raise  # Same collection - the failure was not a stale handle
+        
+        try:
+            return fresh.query(**query_kwargs)
+        except Exception:
+            self.forget_collection(repo_url)
+            raise
     
     def list_collections(self) -> List[Dict[str, Any]]:
         """
@@ -255,6 +344,9 @@ class VectorStore:
             try:
                 # Get collection metadata
                 metadata = collection.metadata or {}
+                if metadata.get("cache"):
+                    # Internal cache collections (e.g. schedule_cache) are not repositories
+                    continue
                 repo_url = metadata.get("repo_url", "unknown")
                 
                 # Get document count
@@ -288,5 +380,23 @@ class VectorStore:
                 f"Collection for repository {repo_url} does not exist"
             )
         
+        self.forget_collection(repo_url)
         self.client.delete_collection(name=collection.name)
 
+
+# Process-wide default instance, shared by agents and workflow nodes that are not given one
+_shared_vector_store: Optional[VectorStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_vector_store() -> VectorStore:
+    """
+    Get the process-wide default vector store.
+    Creates it on first call (lazy loading), so the ChromaDB client is opened once.
+    """
+    global _shared_vector_store
+    if _shared_vector_store is None:
+        with _shared_lock:
+            if _shared_vector_store is None:
+                _shared_vector_store = VectorStore()
+    return _shared_vector_store